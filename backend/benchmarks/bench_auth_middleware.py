@@ -0,0 +1,90 @@
+# benchmarks/bench_auth_middleware.py
+"""
+Requests/sec through the full ASGI stack (CORS, AuthMiddleware, router)
+for the public /health endpoint and an authenticated one.
+
+    python benchmarks/bench_auth_middleware.py [requests] [concurrency]
+
+The authenticated endpoint is measured twice: with the principal cache
+warm (the steady state) and with it cleared before every request (token
+decode plus the users lookup).
+"""
+import asyncio
+import sys
+import time
+
+import common
+
+import httpx
+
+import main
+from models.institute import Institute
+from models.users import User
+from utils.auth_cache import principal_cache
+from utils.jwt_handler import create_access_token
+
+INSTITUTE_ID = "BENCH001"
+ADMIN_EMAIL = "admin@bench.example.com"
+
+
+def seed(db) -> dict:
+    db.add(Institute(
+        institute_id=INSTITUTE_ID,
+        institute_name="Benchmark Institute",
+        address="1 Bench Road",
+        email="office@bench.example.com",
+        phone="0000000000",
+        institute_type="School",
+        student_count=0,
+        contact_person="Principal",
+        subscription_plan="monthly",
+        payment_method="card"
+    ))
+    admin = User(email=ADMIN_EMAIL, password_hash="unused", role="ADMIN", institute_id=INSTITUTE_ID, is_active=True)
+    db.add(admin)
+    db.commit()
+
+    token = create_access_token({"sub": ADMIN_EMAIL, "user_id": admin.id, "role": "ADMIN"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def measure(client, path: str, requests: int, concurrency: int, headers=None, cold: bool = False) -> float:
+    """Requests per second for `requests` GETs, `concurrency` in flight at a time"""
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            if cold:
+                principal_cache.clear()
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def run(requests: int, concurrency: int) -> None:
+    headers = seed(common.fresh_database())
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up imports, the pool and the principal cache
+        await measure(client, "/health", 50, 1)
+        await measure(client, "/users/profile", 50, 1, headers)
+
+        cases = [
+            ("/health", "/health", None, False),
+            ("/users/profile (cache hit)", "/users/profile", headers, False),
+            ("/users/profile (cache miss)", "/users/profile", headers, True),
+        ]
+        print(f"{requests} requests, concurrency {concurrency}, {common.engine.dialect.name}")
+        for label, path, case_headers, cold in cases:
+            rate = await measure(client, path, requests, concurrency, case_headers, cold)
+            print(f"{label:<36} {rate:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    asyncio.run(run(requests, concurrency))
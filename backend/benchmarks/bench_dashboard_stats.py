@@ -0,0 +1,122 @@
+# benchmarks/bench_dashboard_stats.py
+"""
+Latency and statement count of GET /api/super-admin/dashboard-stats at
+platform scale (default 5,000 institutes / 2,000,000 users).
+
+    python benchmarks/bench_dashboard_stats.py [institutes] [users]
+
+Every "cold" call drops the TTL cache first, so it measures the
+aggregate queries; the "cached" calls are what the polling UI gets in
+between.
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import common
+
+import httpx
+from sqlalchemy import event, insert
+
+import main
+from models.institute import Institute
+from models.users import User
+from models.attendance_daily_summary import AttendanceDailySummary
+from routers.super_admin import invalidate_dashboard_stats
+from utils.jwt_handler import create_access_token
+
+# Users inserted per statement while seeding
+SEED_CHUNK = 100000
+ROLES = ["STUDENT"] * 17 + ["FACULTY", "FACULTY", "ADMIN"]
+
+
+def seed(db, institutes: int, users: int) -> dict:
+    rng = random.Random(24)
+    now = datetime.now()
+
+    db.execute(insert(Institute), [
+        {
+            "institute_id": f"I{number:05d}",
+            "institute_name": f"Institute {number}",
+            "address": "1 Bench Road",
+            "email": f"office{number}@bench.example.com",
+            "phone": "0000000000",
+            "institute_type": "School",
+            "student_count": 0,
+            "contact_person": "Principal",
+            "subscription_plan": rng.choice(["monthly", "annual", "Monthly", "Annual", "trial"]),
+            "payment_method": "card",
+            "payment_status": rng.choice(["PAID", "PAID", "PENDING", "SUSPENDED"]),
+            "is_active": rng.random() > 0.1,
+            "created_at": now - timedelta(days=rng.randint(0, 400), hours=rng.randint(0, 23))
+        }
+        for number in range(institutes)
+    ])
+
+    for start in range(0, users, SEED_CHUNK):
+        db.execute(insert(User), [
+            {
+                "id": number + 1,
+                "email": f"user{number}@bench.example.com",
+                "password_hash": "unused",
+                "role": ROLES[number % len(ROLES)],
+                "institute_id": f"I{number % institutes:05d}",
+                "is_active": number % 50 != 0
+            }
+            for number in range(start, min(users, start + SEED_CHUNK))
+        ])
+
+    db.execute(insert(AttendanceDailySummary), [
+        {
+            "institute_id": f"I{number:05d}",
+            "attendance_date": (now - timedelta(days=day)).date(),
+            "present_count": rng.randint(0, 500)
+        }
+        for number in range(min(institutes, 500))
+        for day in range(30)
+    ])
+
+    super_admin_id = users + 1
+    db.add(User(id=super_admin_id, email="root@bench.example.com", password_hash="unused",
+                role="SUPER_ADMIN", is_active=True))
+    db.commit()
+
+    token = create_access_token({"sub": "root@bench.example.com", "user_id": super_admin_id, "role": "SUPER_ADMIN"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def run(institutes: int, users: int) -> None:
+    started = time.perf_counter()
+    headers = seed(common.fresh_database(), institutes, users)
+    print(f"Seeded {institutes} institutes / {users} users in {time.perf_counter() - started:.1f}s "
+          f"({common.engine.dialect.name})")
+
+    statements = []
+    event.listen(common.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(label: str, cold: bool) -> list:
+            samples = []
+            for _ in range(5):
+                if cold:
+                    invalidate_dashboard_stats()
+                statements.clear()
+                call_started = time.perf_counter()
+                response = await client.get("/api/super-admin/dashboard-stats", headers=headers)
+                samples.append(time.perf_counter() - call_started)
+                assert response.status_code == 200, response.text
+            common.print_latencies(f"{label} ({len(statements)} statements)", samples)
+
+        # First call also resolves the super admin's principal
+        await client.get("/api/super-admin/dashboard-stats", headers=headers)
+        await call("cold", True)
+        await call("cached", False)
+
+
+if __name__ == "__main__":
+    institutes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 2000000
+    asyncio.run(run(institutes, users))
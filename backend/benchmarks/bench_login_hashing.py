@@ -0,0 +1,87 @@
+# benchmarks/bench_login_hashing.py
+"""
+/health latency while bcrypt logins are in flight on the same worker.
+
+    python benchmarks/bench_login_hashing.py [seconds] [concurrent_logins]
+
+A prober requests /health every 10ms, first on an idle app and then
+while `concurrent_logins` clients log in back to back. When bcrypt runs
+on the event loop every login stalls /health for the whole hash.
+"""
+import asyncio
+import sys
+import time
+
+import common
+
+import httpx
+
+import main
+from models.users import User
+from utils.hashing import hash_password
+
+PASSWORD = "Bench-Password-1"
+# Seconds between /health probes
+PROBE_INTERVAL = 0.01
+
+
+def seed(db, users: int) -> list:
+    password_hash = hash_password(PASSWORD)
+    emails = [f"user{number}@bench.example.com" for number in range(users)]
+    db.add_all([
+        User(email=email, password_hash=password_hash, role="SUPER_ADMIN", is_active=True)
+        for email in emails
+    ])
+    db.commit()
+    return emails
+
+
+async def probe_health(client, seconds: float) -> list:
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        # Measured from when the probe was due, so a blocked loop counts too
+        due = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        response = await client.get("/health")
+        samples.append(time.perf_counter() - due)
+        assert response.status_code == 200, response.text
+    return samples
+
+
+async def login_loop(client, email: str, deadline: float, samples: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+
+
+async def run(seconds: float, concurrent_logins: int) -> None:
+    emails = seed(common.fresh_database(), concurrent_logins)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await probe_health(client, 0.5)  # warm up
+
+        print(f"{seconds}s per phase, {concurrent_logins} concurrent logins, {common.engine.dialect.name}")
+        common.print_latencies("/health, idle", await probe_health(client, seconds))
+
+        login_samples = []
+        deadline = time.perf_counter() + seconds
+        logins = [
+            asyncio.create_task(login_loop(client, email, deadline, login_samples))
+            for email in emails
+        ]
+        health_samples = await probe_health(client, seconds)
+        await asyncio.gather(*logins)
+
+        common.print_latencies("/health, during logins", health_samples)
+        common.print_latencies("/auth/login", login_samples)
+        print(f"{len(login_samples) / seconds:.1f} logins/s")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrent_logins = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    asyncio.run(run(seconds, concurrent_logins))
@@ -0,0 +1,37 @@
+# benchmarks/common.py
+import os
+import sys
+import tempfile
+
+# Benchmarks seed their own data, so they never run against DATABASE_URL itself:
+# BENCHMARK_DATABASE_URL when set, otherwise a throwaway SQLite file
+_BENCH_DB_DIR = tempfile.mkdtemp(prefix="neuroface-bench-")
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCHMARK_DATABASE_URL", f"sqlite:///{os.path.join(_BENCH_DB_DIR, 'bench.db')}"
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine, Base, SessionLocal
+import models  # noqa: F401  (registers every table on Base.metadata)
+
+
+def fresh_database():
+    """Empty schema in the benchmark database; returns a session on it"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def print_latencies(label: str, samples: list) -> None:
+    """samples in seconds"""
+    print(
+        f"{label:<32} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms "
+        f"max={max(samples) * 1000:8.2f}ms"
+    )
@@ -1,13 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from pathlib import Path
 
 from database import engine, Base
-from routers import institute, contact, users, auth, super_admin, admin,faculty_dashboard, student
-from middleware.auth_middleware import auth_middleware
+from routers import institute, contact, users, auth, super_admin, admin,faculty_dashboard, student, attendance
+from middleware.auth_middleware import AuthMiddleware
+from utils.attendance_events import attendance_events
 
-app = FastAPI(title="NeuroFace AI API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write attendance events still waiting in the queue
+    await attendance_events.stop()
+
+app = FastAPI(title="NeuroFace AI API", lifespan=lifespan)
 
 Base.metadata.create_all(bind=engine)
 
@@ -16,19 +23,20 @@ PROJECT_ROOT = BASE_DIR.parent              # Final Project/
 UI_DIR = PROJECT_ROOT / "UI"
 
 # ---------------- MIDDLEWARE ------------------
+# Registered before CORS so CORS stays outermost and also wraps auth rejections
+app.add_middleware(AuthMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://127.0.0.1:5500", "http://localhost:5500"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination and status headers read by the UI
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Estimate", "X-Message"],
 )
 
 
-
-# ---------------- AUTH MIDDLEWARE -------------
-app.add_middleware(BaseHTTPMiddleware, dispatch=auth_middleware)
-
 # ---------------- ROUTERS ---------------------
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -37,6 +45,7 @@ app.include_router(super_admin.router)
 app.include_router(admin.router)
 app.include_router(faculty_dashboard.router)
 app.include_router(student.router)
+app.include_router(attendance.router)
 app.include_router(contact.router)
 
 # ---------------- HEALTH ----------------------
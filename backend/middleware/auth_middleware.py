@@ -1,64 +1,113 @@
-from fastapi import Request, HTTPException
+import re
+from typing import Optional
+from fastapi import status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from datetime import datetime
 from database import SessionLocal
+from utils.jwt_handler import verify_token
+from utils.auth_cache import AuthPrincipal, principal_cache
 
-async def auth_middleware(request: Request, call_next):
-    # Skip middleware for public routes
-    public_paths = ["/auth/login", "/auth/logout", "/docs", "/redoc", "/openapi.json", "/", "/register-institute", "/users"]
-    
-    if any(request.url.path.startswith(path) for path in public_paths):
-        return await call_next(request)
-    
-    # Check for Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Not authenticated"}
-        )
-    
-    token = auth_header.split("Bearer ")[1]
-    
-    # Check database for token validity
-    db: Session = SessionLocal()
-    try:
-        from models.users import User
-        
-        user = db.query(User).filter(User.token == token).first()
-        
-        if not user:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid token"}
-            )
-        
-        # Check if token is expired
-        if user.token_expiry and user.token_expiry < datetime.utcnow():
-            # Auto logout - set is_active to False
-            user.is_active = False
-            user.token = None
-            user.token_expiry = None
-            db.commit()
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Session expired. Please login again."}
-            )
-        
-        # Check if user is active
-        if not user.is_active:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "User is not active. Please login."}
-            )
-        
-        # Add user info to request state for use in endpoints
-        request.state.user = user
-        request.state.user_id = user.id
-        request.state.user_role = user.role
-        
-        return await call_next(request)
-        
-    finally:
-        db.close()
\ No newline at end of file
+# Paths that never need a principal (precompiled, matched once per request)
+PUBLIC_PATH_RE = re.compile(
+    r"^/(?:$|auth/login(?:/|$)|docs(?:/|$)|redoc(?:/|$)|openapi\.json$|health$"
+    r"|institutes/register(?:/|$)|contact(?:/|$))"
+)
+
+# Role rules per API area, the same roles the routers.auth dependencies allow
+ROLE_AREA_RE = re.compile(r"^/api/(super-admin|admin|faculty|student)(?:/|$)")
+ROLE_RULES = {
+    "super-admin": ({"SUPER_ADMIN"}, "Super Admin privileges required"),
+    "admin": ({"FACULTY", "ADMIN"}, "Faculty or Admin privileges required"),
+    "faculty": ({"FACULTY", "ADMIN", "SUPER_ADMIN"}, "Faculty privileges required"),
+    "student": ({"STUDENT", "FACULTY", "ADMIN", "SUPER_ADMIN"}, "Student privileges required"),
+}
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            value = value.decode("latin-1")
+            if value.startswith("Bearer "):
+                return value[len("Bearer "):]
+            return None
+    return None
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI authentication middleware.
+
+    Resolves the authenticated user once per request: the principal (id,
+    email, role, institute_id, is_active) comes from the in-process
+    principal cache, or on a miss from the JWT and a users lookup on a
+    session stashed as request.state.db for get_db to reuse. The principal
+    is stashed on request.state (user, user_id, user_role, token_payload).
+
+    Active principals with the wrong role for an /api area are rejected
+    here with 403; every other access error (401/403/404) is still raised
+    by the routers.auth dependencies. Responses, including streaming ones,
+    pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        state = scope.setdefault("state", {})
+        state["user"] = None
+        state["token_payload"] = None
+
+        path = scope["path"]
+        if PUBLIC_PATH_RE.match(path):
+            return await self.app(scope, receive, send)
+
+        token = _bearer_token(scope)
+        if not token:
+            return await self.app(scope, receive, send)
+
+        db: Session = None
+        try:
+            # Cache hit: no decode, no DB round trip
+            principal = principal_cache.get(token)
+
+            if principal is None:
+                payload = verify_token(token)
+                if payload and payload.get("sub"):
+                    from models.users import User
+
+                    # One session per request, shared with get_db
+                    db = SessionLocal()
+                    state["db"] = db
+                    state["token_payload"] = payload
+
+                    user = db.query(User).filter(User.email == payload.get("sub")).first()
+                    if user:
+                        principal = AuthPrincipal.from_user(user, token_exp=payload.get("exp"))
+                        principal_cache.put(token, principal)
+
+            if principal is not None:
+                # Add user info to request state for use in endpoints
+                state["user"] = principal
+                state["user_id"] = principal.id
+                state["user_role"] = principal.role
+
+                # Role-based route protection
+                area = ROLE_AREA_RE.match(path)
+                if area and principal.is_active:
+                    allowed_roles, detail = ROLE_RULES[area.group(1)]
+                    if principal.role not in allowed_roles:
+                        response = JSONResponse(
+                            status_code=status.HTTP_403_FORBIDDEN,
+                            content={"detail": detail}
+                        )
+                        return await response(scope, receive, send)
+
+            await self.app(scope, receive, send)
+
+        finally:
+            if db is not None:
+                state["db"] = None
+                db.close()
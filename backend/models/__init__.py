@@ -6,5 +6,10 @@ from .student import Student
 from .attendance import Attendance
 from .faculty_class import FacultyClass
 from .faculty_student import FacultyStudent
+from .attendance_daily_summary import AttendanceDailySummary
+from .institute_calendar import InstituteCalendar
+from .institute_holiday import InstituteHoliday
+from .institute_daily_usage import InstituteDailyUsage
+from .user_daily_activity import UserDailyActivity
 
-__all__ = ["User", "Institute", "Faculty", "Student", "Attendance", "FacultyClass", "FacultyStudent"]
\ No newline at end of file
+__all__ = ["User", "Institute", "Faculty", "Student", "Attendance", "FacultyClass", "FacultyStudent", "AttendanceDailySummary", "InstituteCalendar", "InstituteHoliday", "InstituteDailyUsage", "UserDailyActivity"]
\ No newline at end of file
@@ -0,0 +1,20 @@
+# models/attendance_daily_summary.py
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class AttendanceDailySummary(Base):
+    __tablename__ = "attendance_daily_summary"
+
+    institute_id = Column(
+        String(100),
+        ForeignKey("institute_details.institute_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    attendance_date = Column(Date, primary_key=True)
+    # Empty string stands for "no class/stream" so the composite key stays NOT NULL
+    standard = Column(String(50), primary_key=True, default="")
+    stream = Column(String(100), primary_key=True, default="")
+
+    present_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
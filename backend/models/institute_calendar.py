@@ -0,0 +1,17 @@
+# models/institute_calendar.py
+from sqlalchemy import Column, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class InstituteCalendar(Base):
+    __tablename__ = "institute_calendar"
+
+    institute_id = Column(
+        String(100),
+        ForeignKey("institute_details.institute_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # Monday..Sunday, "1" = working day (numpy busday weekmask); default Mon-Fri
+    weekmask = Column(String(7), nullable=False, default="1111100")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,23 @@
+# models/institute_daily_usage.py
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class InstituteDailyUsage(Base):
+    __tablename__ = "institute_daily_usage"
+
+    institute_id = Column(
+        String(100),
+        ForeignKey("institute_details.institute_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    usage_date = Column(Date, primary_key=True)
+
+    # Attendance records written for this date (face recognition and manual marking)
+    attendance_events = Column(Integer, nullable=False, default=0)
+    # Distinct users who logged in on this date
+    active_users = Column(Integer, nullable=False, default=0)
+    logins = Column(Integer, nullable=False, default=0)
+    report_generations = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,17 @@
+# models/institute_holiday.py
+from sqlalchemy import Column, String, Date, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+class InstituteHoliday(Base):
+    __tablename__ = "institute_holidays"
+
+    institute_id = Column(
+        String(100),
+        ForeignKey("institute_details.institute_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    holiday_date = Column(Date, primary_key=True)
+    name = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,15 @@
+# models/user_daily_activity.py
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from database import Base
+
+# One row per user per day with a login, feeds active_users of the usage rollup
+class UserDailyActivity(Base):
+    __tablename__ = "user_daily_activity"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    activity_date = Column(Date, primary_key=True)
+    institute_id = Column(
+        String(100),
+        ForeignKey("institute_details.institute_id", ondelete="CASCADE"),
+        nullable=False
+    )
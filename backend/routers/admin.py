@@ -1,29 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, extract, and_, or_, desc, asc, text
+from sqlalchemy import func, extract, and_, or_, desc, asc, text, tuple_
 from typing import List, Optional
 from datetime import datetime, date, timedelta
+from collections import Counter
+from pydantic import TypeAdapter
+import base64
 import calendar
-import pandas as pd
-from io import BytesIO
-import csv
+import json
 
-from database import get_db
+from database import get_db, SessionLocal
 from models.users import User
 from models.institute import Institute
 from models.student import Student
 from models.faculty import Faculty
 from models.faculty_class import FacultyClass
 from models.attendance import Attendance
+from models.institute_calendar import InstituteCalendar
+from models.institute_holiday import InstituteHoliday
 from schemas.admin import(
     DashboardStats, FacultyCreate, FacultyResponse, FacultyUpdate,
     StudentResponse, AttendanceResponse, AttendanceCreate,
     BulkAttendanceCreate, AttendanceStats, WeeklyTrendItem,
-    ExportRequest
+    ExportRequest, CalendarUpdate, HolidayCreate
 )
 from routers.auth import get_institute_admin
-from utils.hashing import hash_password
+from utils.auth_cache import principal_cache
+from utils.hashing import hash_password_async
 from utils.reports_generator import ReportGenerator
+from utils.report_jobs import report_jobs
+from utils.attendance_stats import get_student_attendance_summary, build_attendance_trend, get_daily_attendance_counts
+from utils.attendance_summary import adjust_daily_summary
+from utils.attendance_writes import insert_attendance_ignore_existing
+from utils.attendance_bitsets import attendance_bitsets
+from utils.usage_rollup import record_usage
+from utils.school_calendar import get_working_calendar, invalidate_working_calendar, weekmask_from_weekend_days
+from utils.export_writers import (
+    iter_csv, iter_file, write_excel, write_arrow,
+    EXCEL_CONTENT_TYPE, ARROW_FORMATS, EXPORT_BATCH_SIZE
+)
 router = APIRouter(
     prefix="/api/admin",
     tags=["Admin Dashboard"]
@@ -66,16 +83,22 @@ async def get_dashboard_stats(
         print(f"ERROR in student query: {str(e)}")
         total_students = 0
     
-    # 2. Today's Attendance
+    # 2. Weekly Attendance Trend (Last 7 days including today, one grouped query)
     today = date.today()
     try:
-        today_attendance_count = db.query(Attendance).filter(
-            Attendance.institute_id == institute_id,
-            Attendance.attendance_date == today
-        ).count()
+        weekly_trend = build_attendance_trend(
+            db,
+            total_students,
+            days=7,
+            end_date=today,
+            institute_id=institute_id
+        )
     except Exception as e:
-        print(f"ERROR in attendance query: {str(e)}")
-        today_attendance_count = 0
+        print(f"ERROR in weekly attendance query: {str(e)}")
+        weekly_trend = []
+    
+    # 3. Today's Attendance (last day of the trend)
+    today_attendance_count = weekly_trend[-1]["present"] if weekly_trend else 0
     
     # For AI-recorded attendance, every record is considered "present"
     today_present = today_attendance_count
@@ -87,7 +110,7 @@ async def get_dashboard_stats(
     else:
         today_attendance_rate = 0
     
-    # 3. Active Faculty
+    # 4. Active Faculty
     try:
         active_faculty = db.query(Faculty).filter(
             Faculty.institute_id == institute_id,
@@ -98,32 +121,6 @@ async def get_dashboard_stats(
         print(f"ERROR in faculty query: {str(e)}")
         active_faculty = 0
     
-    # 4. Weekly Attendance Trend (Last 7 days including today)
-    weekly_trend = []
-    for i in range(6, -1, -1):  # 6 days ago to today
-        day = today - timedelta(days=i)
-        try:
-            day_attendance_count = db.query(Attendance).filter(
-                Attendance.institute_id == institute_id,
-                Attendance.attendance_date == day
-            ).count()
-        except Exception as e:
-            print(f"ERROR in weekly attendance query for {day}: {str(e)}")
-            day_attendance_count = 0
-        
-        if total_students > 0:
-            rate = (day_attendance_count / total_students) * 100
-        else:
-            rate = 0
-        
-        weekly_trend.append({
-            "date": day.strftime("%Y-%m-%d"),
-            "day_name": day.strftime("%A")[:3],
-            "attendance_rate": round(rate, 1),
-            "total": total_students,
-            "present": day_attendance_count
-        })
-    
     return DashboardStats(
         total_students=total_students,
         today_attendance_rate=round(today_attendance_rate, 1),
@@ -134,17 +131,35 @@ async def get_dashboard_stats(
         today_total=today_total
     )
 # ==================== FACULTY MANAGEMENT API ====================
+# Joins class names aggregated in SQL (not a character used in class names)
+CLASS_NAME_SEPARATOR = "\x1f"
+
 @router.get("/faculty", response_model=List[FacultyResponse])
 async def get_faculty_list(
+    response: Response,
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_institute_admin),
     status_filter: Optional[str] = Query(None, alias="status"),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size, all faculty when omitted")
 ):
     """
     Get list of all faculty members with their assigned classes
+    
+    Faculty, their classes (aggregated) and the total number of matches
+    (window function, returned in X-Total-Count) come from one query.
     """
-    query = db.query(Faculty).filter(
+    # Assigned classes of each faculty aggregated into one string
+    class_names = func.aggregate_strings(FacultyClass.class_name, CLASS_NAME_SEPARATOR)
+    
+    query = db.query(
+        Faculty,
+        class_names.label("class_names"),
+        func.count().over().label("total_count")
+    ).outerjoin(
+        FacultyClass, FacultyClass.faculty_id == Faculty.id
+    ).filter(
         Faculty.institute_id == admin_user.institute_id
     )
     
@@ -157,21 +172,16 @@ async def get_faculty_list(
         query = query.filter(
             or_(
                 Faculty.full_name.ilike(search_term),
-                Faculty.email.ilike(search_term),
-                Faculty.employee_id.ilike(search_term)
+                Faculty.email.ilike(search_term)
             )
         )
     
-    faculty_list = query.order_by(Faculty.created_at.desc()).all()
+    query = query.group_by(Faculty.id).order_by(Faculty.created_at.desc(), Faculty.id.desc())
+    
+    rows = query.offset((page - 1) * limit).limit(limit).all() if limit else query.all()
     
     result = []
-    for faculty in faculty_list:
-        # Get assigned classes as strings
-        assigned_classes = db.query(FacultyClass.class_name).filter(
-            FacultyClass.faculty_id == faculty.id
-        ).all()
-        class_names = [cls[0] for cls in assigned_classes]  # Extract strings
-        
+    for faculty, faculty_class_names, total_count in rows:
         # Create response dictionary
         faculty_dict = {
             "id": faculty.id,
@@ -186,11 +196,20 @@ async def get_faculty_list(
             "last_login": faculty.last_login,
             "created_at": faculty.created_at,
             "updated_at": faculty.updated_at,
-            "assigned_classes": class_names  # List of strings
+            "assigned_classes": sorted(faculty_class_names.split(CLASS_NAME_SEPARATOR)) if faculty_class_names else []  # List of strings
         }
         
         result.append(FacultyResponse(**faculty_dict))
     
+    if rows:
+        total_count = rows[0].total_count
+    elif limit and page > 1:
+        # Page past the end, count the matches separately
+        total_count = query.count()
+    else:
+        total_count = 0
+    response.headers["X-Total-Count"] = str(total_count)
+    
     return result
 
 @router.post("/faculty", response_model=FacultyResponse)
@@ -270,7 +289,7 @@ async def add_faculty(
     # Create user account for faculty
     new_user = User(
         email=faculty_data.email,
-        password_hash=hash_password("faculty@123"),  # Default password
+        password_hash=await hash_password_async("faculty@123"),  # Default password
         role="FACULTY",
         institute_id=institute_id,
         is_active=True
@@ -482,6 +501,8 @@ async def delete_faculty(
     
     try:
         db.commit()
+        if faculty.user_id:
+            principal_cache.invalidate_user(faculty.user_id)
         return {"message": "Faculty deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -491,6 +512,47 @@ async def delete_faculty(
         )
 
 # ==================== STUDENT MANAGEMENT API ====================
+# Columns of the student list, in StudentResponse order
+STUDENT_LIST_COLUMNS = (
+    Student.student_id, Student.roll_no, Student.full_name, Student.standard,
+    Student.stream, Student.image_folder, Student.email, Student.phone,
+    Student.institute_id, Student.status, Student.is_active, Student.registered_by,
+    Student.registration_date, Student.created_at, Student.updated_at
+)
+STUDENT_LIST_FIELDS = [column.key for column in STUDENT_LIST_COLUMNS]
+# Validates and serializes a page exactly as response_model=List[StudentResponse] would
+STUDENT_LIST_ADAPTER = TypeAdapter(List[StudentResponse])
+
+def encode_student_cursor(roll_no: str, student_id: int) -> str:
+    """Opaque keyset cursor for the position after (roll_no, student_id)"""
+    raw = json.dumps([roll_no, student_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_student_cursor(cursor: str):
+    """(roll_no, student_id) of a cursor; 400 when it is not one of ours"""
+    try:
+        roll_no, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(roll_no), int(student_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def estimate_query_rows(db: Session, query) -> int:
+    """
+    Planner row estimate of a query on PostgreSQL (EXPLAIN, nothing is
+    scanned); exact count on other databases
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.order_by(None).count()
+    
+    compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+    plan = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 @router.get("/students", response_model=List[StudentResponse])
 async def get_students_list(
     db: Session = Depends(get_db),
@@ -498,31 +560,23 @@ async def get_students_list(
     class_filter: Optional[str] = Query(None, alias="standard"),
     stream_filter: Optional[str] = Query(None, alias="stream"),
     status_filter: Optional[str] = Query(None, alias="status"),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size, all students when omitted"),
+    estimate_total: bool = Query(False, description="Return an estimated match count in X-Total-Estimate")
 ):
     """
     Get list of all students
     Returns empty list with message in response headers if no students found
+    
+    Ordered by (roll_no, student_id) with keyset pagination: when a page is
+    full, the cursor of the next page is returned in X-Next-Cursor.
     """
     institute_id = admin_user.institute_id
     
-    print(f"DEBUG: Getting students for institute: {institute_id}")
-    
     try:
-        # First check if institute exists
-        institute = db.query(Institute).filter(
-            Institute.institute_id == institute_id
-        ).first()
-        
-        if not institute:
-            # Return response with custom header
-            response = Response()
-            response.headers["X-Message"] = "Institute not found"
-            response.status_code = 200
-            return []
-        
-        # Build query
-        query = db.query(Student).filter(
+        # Build query (plain row tuples, no ORM objects)
+        query = db.query(*STUDENT_LIST_COLUMNS).filter(
             Student.institute_id == institute_id,
             Student.is_active == True
         )
@@ -548,36 +602,43 @@ async def get_students_list(
                 )
             )
         
-        students = query.order_by(Student.roll_no).all()
+        headers = {}
+        if estimate_total:
+            headers["X-Total-Estimate"] = str(estimate_query_rows(db, query))
+        
+        # Keyset pagination: continue after the last (roll_no, student_id)
+        if cursor:
+            query = query.filter(
+                tuple_(Student.roll_no, Student.student_id) > decode_student_cursor(cursor)
+            )
+        
+        query = query.order_by(Student.roll_no, Student.student_id)
+        
+        rows = query.limit(limit).all() if limit else query.all()
         
-        print(f"DEBUG: Found {len(students)} students for institute {institute_id}")
+        if limit and len(rows) == limit:
+            headers["X-Next-Cursor"] = encode_student_cursor(rows[-1].roll_no, rows[-1].student_id)
         
-        if len(students) == 0:
-            # Return response with custom header
-            response = Response()
-            response.headers["X-Message"] = "No students registered in this institute"
-            response.headers["X-Total-Count"] = "0"
-            response.status_code = 200
-            return []
+        if not rows and not cursor:
+            headers["X-Message"] = "No students registered in this institute"
+            headers["X-Total-Count"] = "0"
         
-        return students
+        # Serialize the tuples directly, with the response model's encoding
+        content = STUDENT_LIST_ADAPTER.dump_json(
+            STUDENT_LIST_ADAPTER.validate_python(
+                [dict(zip(STUDENT_LIST_FIELDS, row)) for row in rows]
+            )
+        )
+        return Response(content=content, media_type="application/json", headers=headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"ERROR in get_students_list: {str(e)}")
-        # If there's a foreign key constraint error, return empty list
-        if "foreign key constraint" in str(e).lower():
-            print(f"WARNING: Foreign key constraint issue for institute {institute_id}")
-            response = Response()
-            response.headers["X-Message"] = "Database constraint error. Please contact administrator."
-            response.headers["X-Total-Count"] = "0"
-            response.status_code = 200
-            return []
-        else:
-            # Re-raise other errors
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error retrieving students: {str(e)}"
-            )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving students: {str(e)}"
+        )
 
 @router.get("/students/{student_id}", response_model=StudentResponse)
 async def get_student_details(
@@ -602,36 +663,65 @@ async def get_student_details(
 # ==================== ATTENDANCE MANAGEMENT API ====================
 @router.get("/attendance/daily", response_model=List[AttendanceResponse])
 async def get_daily_attendance(
+    response: Response,
     date: date = Query(..., description="Attendance date (YYYY-MM-DD)"),
+    class_filter: Optional[str] = Query(None, alias="standard"),
+    stream_filter: Optional[str] = Query(None, alias="stream"),
+    after_id: Optional[int] = Query(None, description="Cursor: X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size, all records when omitted"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_institute_admin)
 ):
     """
     Get attendance for a specific date
+    
+    One joined query per page, ordered by attendance id. When a page is
+    full, the cursor of the next page is returned in the X-Next-Cursor header.
     """
-    attendance_records = db.query(Attendance).filter(
+    # Attendance and student columns in a single projection
+    query = db.query(
+        Attendance.id,
+        Attendance.student_id,
+        Student.full_name.label("student_name"),
+        Student.roll_no,
+        Student.standard.label("class_name"),
+        Student.stream,
+        Attendance.attendance_date,
+        Attendance.institute_id,
+        Attendance.created_at
+    ).join(
+        Student, Attendance.student_id == Student.student_id
+    ).filter(
         Attendance.institute_id == admin_user.institute_id,
         Attendance.attendance_date == date
-    ).all()
+    )
     
-    # Get student details for each attendance record
-    result = []
-    for record in attendance_records:
-        student = db.query(Student).filter(Student.student_id == record.student_id).first()
-        if student:
-            result.append(AttendanceResponse(
-                id=record.id,
-                student_id=record.student_id,
-                student_name=student.full_name,
-                roll_no=student.roll_no,
-                class_name=student.standard,
-                stream=student.stream,
-                attendance_date=record.attendance_date,
-                institute_id=record.institute_id,
-                created_at=record.created_at
-            ))
+    # Apply filters
+    if class_filter:
+        query = query.filter(Student.standard == class_filter)
     
-    return result
+    if stream_filter:
+        query = query.filter(Student.stream == stream_filter)
+    
+    # Keyset pagination: continue after the last id of the previous page
+    if after_id is not None:
+        query = query.filter(Attendance.id > after_id)
+    
+    query = query.order_by(Attendance.id)
+    
+    if limit:
+        query = query.limit(limit)
+    
+    records = query.all()
+    
+    if limit and len(records) == limit:
+        response.headers["X-Next-Cursor"] = str(records[-1].id)
+    
+    return [AttendanceResponse.model_validate(record) for record in records]
+
+# Statuses accepted by /attendance/mark; all but ABSENT are stored as a present record
+ATTENDANCE_STATUSES = {"PRESENT", "ABSENT", "LATE", "HALF_DAY"}
+PRESENT_STATUSES = {"PRESENT", "LATE", "HALF_DAY"}
 
 @router.post("/attendance/mark")
 async def mark_attendance(
@@ -650,56 +740,90 @@ async def mark_attendance(
     error_count = 0
     errors = []
     
+    # 1. Validate every submitted student against the institute with one IN query
+    requested_ids = set()
+    for record in records:
+        try:
+            requested_ids.add(int(record.get('student_id')))
+        except (TypeError, ValueError):
+            pass
+    
+    students = {}
+    if requested_ids:
+        students = {
+            student.student_id: student
+            for student in db.query(Student).filter(
+                Student.student_id.in_(requested_ids),
+                Student.institute_id == institute_id,
+                Student.is_active == True
+            )
+        }
+    
+    # 2. Per-record results, in submission order
+    new_rows = {}
     for record in records:
         student_id = record.get('student_id')
+        attendance_status = str(record.get('status') or '').strip().upper()
         
-        if not student_id or not status:
+        if not student_id or not attendance_status:
             error_count += 1
             errors.append(f"Missing student_id or status in record: {record}")
             continue
         
-        # Check if student exists and belongs to this institute
-        student = db.query(Student).filter(
-            Student.student_id == student_id,
-            Student.institute_id == institute_id,
-            Student.is_active == True
-        ).first()
+        if attendance_status not in ATTENDANCE_STATUSES:
+            error_count += 1
+            errors.append(
+                f"Invalid status '{record.get('status')}' for student {student_id}, "
+                f"expected one of {', '.join(sorted(ATTENDANCE_STATUSES))}"
+            )
+            continue
+        
+        try:
+            student = students.get(int(student_id))
+        except (TypeError, ValueError):
+            student = None
         
         if not student:
             error_count += 1
             errors.append(f"Student not found or not active: {student_id}")
             continue
         
-        # Check if attendance already marked for this date
-        existing_attendance = db.query(Attendance).filter(
-            Attendance.student_id == student_id,
-            Attendance.attendance_date == attendance_date
-        ).first()
+        success_count += 1
         
-        try:
-            if existing_attendance:
-                # Update existing attendance
-                existing_attendance.status = status
-                existing_attendance.recorded_by = admin_user.id
-            else:
-                # Create new attendance record
-                new_attendance = Attendance(
-                    student_id=student_id,
-                    attendance_date=attendance_date,
-                    recorded_by=admin_user.id,
-                    institute_id=institute_id,
-                    created_at=datetime.utcnow()
-                )
-                db.add(new_attendance)
-            
-            success_count += 1
-            
-        except Exception as e:
-            error_count += 1
-            errors.append(f"Error processing student {student_id}: {str(e)}")
+        # Absent is the absence of a record: nothing to write
+        if attendance_status not in PRESENT_STATUSES:
+            continue
+        
+        # An existing record already means present, it is skipped on insert
+        new_rows.setdefault(student.student_id, {
+            "student_id": student.student_id,
+            "attendance_date": attendance_date,
+            "institute_id": institute_id,
+            "created_at": datetime.utcnow()
+        })
     
     try:
+        # 3. One INSERT ... ON CONFLICT (student_id, attendance_date) DO NOTHING
+        inserted = insert_attendance_ignore_existing(db, new_rows.values())
+        marked_student_ids = [student_id for student_id, _ in inserted]
+        
+        # 4. Count the new records in the daily summary, one update per class/stream
+        class_counts = Counter(
+            (students[student_id].standard, students[student_id].stream)
+            for student_id in marked_student_ids
+        )
+        for (standard, stream), count in class_counts.items():
+            adjust_daily_summary(db, institute_id, attendance_date, standard, stream, count)
+        
+        # 5. Count them in the institute usage rollup
+        record_usage(db, institute_id, attendance_date, attendance_events=len(marked_student_ids))
+        
         db.commit()
+        
+        # Set the committed days in the cached attendance bitsets
+        for student_id in marked_student_ids:
+            attendance_bitsets.mark_present(student_id, attendance_date)
+        
         return {
             "message": "Attendance marked successfully",
             "success_count": success_count,
@@ -731,11 +855,10 @@ async def get_attendance_stats(
         Student.status == 'ACTIVE'
     ).count()
     
-    # Get attendance count for the date
-    attendance_count = db.query(Attendance).filter(
-        Attendance.institute_id == institute_id,
-        Attendance.attendance_date == date
-    ).count()
+    # Get attendance count for the date from the daily summary
+    attendance_count = get_daily_attendance_counts(
+        db, date, date, institute_id=institute_id
+    ).get(date, 0)
     
     # For AI-recorded attendance:
     # - present_count = number of attendance records for that date
@@ -760,21 +883,44 @@ async def get_attendance_stats(
     )
 
 # ==================== EXPORT REPORTS API ====================
-@router.post("/export")
-async def export_reports(
-    export_request: ExportRequest,
-    db: Session = Depends(get_db),
-    admin_user: User = Depends(get_institute_admin)
-):
+EXPORT_COLUMNS = {
+    "attendance": ["Date", "Roll No", "Student Name", "Class", "Stream", "Status", "Recorded At"],
+    "students": ["Roll No", "Full Name", "Class", "Stream", "Email", "Phone", "Status", "Registered By", "Register Date"],
+    "faculty": ["Full Name", "Email", "Phone", "Status", "Last Login", "Created At"]
+}
+
+# Typed columns of the Parquet/Arrow exports: (query column, type)
+EXPORT_ARROW_FIELDS = {
+    "attendance": [
+        ("attendance_date", "date"), ("student_id", "int"), ("roll_no", "string"),
+        ("full_name", "string"), ("standard", "category"), ("stream", "category"),
+        ("created_at", "timestamp")
+    ],
+    "students": [
+        ("student_id", "int"), ("roll_no", "string"), ("full_name", "string"),
+        ("standard", "category"), ("stream", "category"), ("email", "string"),
+        ("phone", "string"), ("status", "category"), ("registered_by", "string"),
+        ("created_at", "timestamp")
+    ],
+    "faculty": [
+        ("full_name", "string"), ("email", "string"), ("phone", "string"),
+        ("status", "category"), ("last_login", "timestamp"), ("created_at", "timestamp")
+    ]
+}
+
+def build_export_query(db: Session, export_request: ExportRequest, institute_id: str):
     """
-    Export reports in Excel, CSV, or PDF format
+    Build the column-only export query for a report type
+
+    Returns: (query, columns, format_row) where format_row turns one result
+    row into the list of values for columns
     """
-    institute_id = admin_user.institute_id
-    
     if export_request.report_type == "attendance":
         # Export attendance report
         query = db.query(
-            Attendance,
+            Attendance.attendance_date,
+            Attendance.created_at,
+            Student.student_id,
             Student.full_name,
             Student.roll_no,
             Student.standard,
@@ -792,26 +938,34 @@ async def export_reports(
         if export_request.batch:
             query = query.filter(Student.standard == export_request.batch)
         
-        records = query.order_by(Attendance.attendance_date.desc()).all()
+        query = query.order_by(Attendance.attendance_date.desc())
         
-        # Prepare data for export
-        data = []
-        for record in records:
-            attendance, student_name, roll_no, class_name, stream = record
+        def format_row(row):
             # Since attendance is AI-recorded, we can mark all as "Present"
-            data.append({
-                "Date": attendance.attendance_date.strftime("%Y-%m-%d"),
-                "Roll No": roll_no,
-                "Student Name": student_name,
-                "Class": class_name or "",
-                "Stream": stream or "",
-                "Status": "Present",  # All AI-recorded attendance is considered Present
-                "Recorded At": attendance.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            })
+            return [
+                row.attendance_date.strftime("%Y-%m-%d"),
+                row.roll_no,
+                row.full_name,
+                row.standard or "",
+                row.stream or "",
+                "Present",  # All AI-recorded attendance is considered Present
+                row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else ""
+            ]
         
     elif export_request.report_type == "students":
         # Export student list
-        query = db.query(Student).filter(
+        query = db.query(
+            Student.student_id,
+            Student.roll_no,
+            Student.full_name,
+            Student.standard,
+            Student.stream,
+            Student.email,
+            Student.phone,
+            Student.status,
+            Student.registered_by,
+            Student.created_at
+        ).filter(
             Student.institute_id == institute_id,
             Student.is_active == True
         )
@@ -819,67 +973,139 @@ async def export_reports(
         if export_request.batch:
             query = query.filter(Student.standard == export_request.batch)
         
-        students = query.order_by(Student.roll_no).all()
-        
-        data = []
-        for student in students:
-            data.append({
-                "Roll No": student.roll_no,
-                "Full Name": student.full_name,
-                "Class": student.standard or "",
-                "Stream": student.stream or "",
-                "Email": student.email or "",
-                "Phone": student.phone or "",
-                "Status": student.status,
-                "Registered By": student.registered_by or "",
-                "Register Date": student.created_at.strftime("%Y-%m-%d") if student.created_at else ""
-            })
+        query = query.order_by(Student.roll_no)
+        
+        def format_row(row):
+            return [
+                row.roll_no,
+                row.full_name,
+                row.standard or "",
+                row.stream or "",
+                row.email or "",
+                row.phone or "",
+                row.status,
+                row.registered_by or "",
+                row.created_at.strftime("%Y-%m-%d") if row.created_at else ""
+            ]
     
     elif export_request.report_type == "faculty":
         # Export faculty list
-        faculty_list = db.query(Faculty).filter(
+        query = db.query(
+            Faculty.full_name,
+            Faculty.email,
+            Faculty.phone,
+            Faculty.status,
+            Faculty.last_login,
+            Faculty.created_at
+        ).filter(
             Faculty.institute_id == institute_id,
             Faculty.is_active == True
-        ).order_by(Faculty.created_at.desc()).all()
-        
-        data = []
-        for faculty in faculty_list:
-            data.append({
-                "Full Name": faculty.full_name,
-                "Email": faculty.email,
-                "Phone": faculty.phone or "",
-                "Status": faculty.status,
-                "Last Login": faculty.last_login.strftime("%Y-%m-%d %H:%M:%S") if faculty.last_login else "",
-                "Created At": faculty.created_at.strftime("%Y-%m-%d %H:%M:%S")
-            })
+        ).order_by(Faculty.created_at.desc())
+        
+        def format_row(row):
+            return [
+                row.full_name,
+                row.email,
+                row.phone or "",
+                row.status,
+                row.last_login.strftime("%Y-%m-%d %H:%M:%S") if row.last_login else "",
+                row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else ""
+            ]
     
     else:
         raise HTTPException(status_code=400, detail="Invalid report type")
     
+    return query, EXPORT_COLUMNS[export_request.report_type], format_row
+
+def stream_csv_export(export_request: ExportRequest, institute_id: str):
+    """
+    Yield the CSV export in chunks from a server-side cursor.
+    Runs on its own session because the response outlives the request's
+    dependencies.
+    """
+    db = SessionLocal()
+    try:
+        query, columns, format_row = build_export_query(db, export_request, institute_id)
+        rows = query.yield_per(EXPORT_BATCH_SIZE)  # stream_results: server-side cursor
+        yield from iter_csv(rows, columns, format_row)
+    finally:
+        db.close()
+
+def record_report_generation(db: Session, institute_id: str) -> None:
+    """Count a generated report or export in the institute usage rollup (never fails the request)"""
+    try:
+        record_usage(db, institute_id, date.today(), report_generations=1)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error recording report usage: {str(e)}")
+
+@router.post("/export")
+async def export_reports(
+    export_request: ExportRequest,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Export reports in Excel, CSV, Parquet or Arrow format
+    CSV is streamed from a server-side cursor in constant memory; Parquet
+    and Arrow keep dates, ids and timestamps typed
+    """
+    institute_id = admin_user.institute_id
+    
+    if export_request.report_type not in EXPORT_COLUMNS:
+        raise HTTPException(status_code=400, detail="Invalid report type")
+    
+    if export_request.format not in ("excel", "csv") and export_request.format not in ARROW_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+    
+    record_report_generation(db, institute_id)
+    
     # Export based on format
     if export_request.format == "excel":
-        df = pd.DataFrame(data)
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Report')
-            writer._save()
-        
-        output.seek(0)
-        return Response(
-            content=output.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        def write_export_workbook():
+            query, columns, format_row = build_export_query(db, export_request, institute_id)
+            rows = query.yield_per(EXPORT_BATCH_SIZE)  # stream_results: server-side cursor
+            return write_excel([('Report', columns, (format_row(row) for row in rows))])
+        
+        # Rows go straight from the cursor into a write-only workbook, off the event loop
+        output = await run_in_threadpool(write_export_workbook)
+        return StreamingResponse(
+            iter_file(output),
+            media_type=EXCEL_CONTENT_TYPE,
             headers={"Content-Disposition": f"attachment; filename={export_request.report_type}_report.xlsx"}
         )
     
+    elif export_request.format in ARROW_FORMATS:
+        fields = EXPORT_ARROW_FIELDS[export_request.report_type]
+        
+        def write_export_columnar():
+            query, _, _ = build_export_query(db, export_request, institute_id)
+            rows = query.yield_per(EXPORT_BATCH_SIZE)  # stream_results: server-side cursor
+            return write_arrow(
+                (tuple(getattr(row, name) for name, _ in fields) for row in rows),
+                fields,
+                export_request.format
+            )
+        
+        try:
+            output = await run_in_threadpool(write_export_columnar)
+        except ImportError:
+            raise HTTPException(
+                status_code=501,
+                detail="Parquet/Arrow export is not available (pyarrow is not installed)"
+            )
+        
+        extension, media_type = ARROW_FORMATS[export_request.format]
+        return StreamingResponse(
+            iter_file(output),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={export_request.report_type}_report{extension}"}
+        )
+    
     elif export_request.format == "csv":
-        output = BytesIO()
-        writer = csv.DictWriter(output, fieldnames=data[0].keys() if data else [])
-        writer.writeheader()
-        writer.writerows(data)
-        
-        output.seek(0)
-        return Response(
-            content=output.getvalue(),
+        return StreamingResponse(
+            stream_csv_export(export_request, institute_id),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename={export_request.report_type}_report.csv"}
         )
@@ -893,6 +1119,153 @@ from datetime import datetime
 from typing import Optional
 from fastapi import Query
 
+def parse_report_date(date_str: Optional[str]) -> Optional[date]:
+    """Parse a report date in DD-MM-YYYY (or YYYY-MM-DD) format"""
+    if not date_str:
+        return None
+    try:
+        # Try DD-MM-YYYY format
+        return datetime.strptime(date_str, "%d-%m-%Y").date()
+    except ValueError:
+        # Try YYYY-MM-DD format (for backward compatibility)
+        try:
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid date format: {date_str}. Use DD-MM-YYYY format"
+            )
+
+def resolve_report_period(
+    date_filter: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str]
+):
+    """
+    Determine the report date range
+
+    Returns: (start_date, end_date)
+    """
+    parsed_date_filter = parse_report_date(date_filter)
+    parsed_start_date = parse_report_date(start_date)
+    parsed_end_date = parse_report_date(end_date)
+    
+    if parsed_date_filter:
+        # Single date
+        return parsed_date_filter, parsed_date_filter
+    elif parsed_start_date and parsed_end_date:
+        # Date range
+        return parsed_start_date, parsed_end_date
+    else:
+        # Default: last 30 days
+        end_date_obj = date.today()
+        return end_date_obj - timedelta(days=29), end_date_obj
+
+def build_attendance_report(
+    db: Session,
+    institute_id: str,
+    institute_name: str,
+    class_filter: Optional[str],
+    stream_filter: Optional[str],
+    date_filter: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str]
+):
+    """
+    Collect attendance report rows and statistics for ReportGenerator
+
+    Returns: (report_data, statistics, filters)
+    """
+    start_date_obj, end_date_obj = resolve_report_period(date_filter, start_date, end_date)
+    
+    # Working days of the period (institute weekends and holidays excluded)
+    total_days = get_working_calendar(institute_id, db).count(start_date_obj, end_date_obj)
+    
+    filters = {
+        'class_filter': class_filter or 'All',
+        'stream_filter': stream_filter or 'All',
+        'date_filter': date_filter,
+        'start_date': start_date,
+        'end_date': end_date,
+        'institute_name': institute_name
+    }
+    
+    # Present days and last attendance for every student in one grouped query
+    students = get_student_attendance_summary(
+        db,
+        institute_id,
+        start_date_obj,
+        end_date_obj,
+        class_filter=class_filter,
+        stream_filter=stream_filter
+    )
+    
+    if not students:
+        # Empty data report
+        statistics = {
+            'total_students': 0,
+            'average_attendance': 0,
+            'present_count': 0,
+            'absent_count': 0,
+            'total_days': 0,
+            'filtered_count': 0
+        }
+        return [], statistics, filters
+    
+    # Build report rows from the aggregated result
+    report_data = []
+    total_present_days = 0
+    
+    for student in students:
+        present_days = student.present_days
+        
+        # Calculate attendance percentage
+        attendance_percentage = (present_days / total_days) * 100 if total_days > 0 else 0
+        
+        report_data.append({
+            'roll_no': student.roll_no,
+            'student_name': student.full_name,
+            'class_name': student.standard,
+            'stream': student.stream,
+            'attendance_percentage': attendance_percentage,
+            'present_days': present_days,
+            'total_days': total_days,
+            'last_attendance': student.last_attendance,
+            'email': student.email,
+            'phone': student.phone
+        })
+        
+        total_present_days += present_days
+    
+    # Calculate statistics
+    total_students = len(students)
+    average_attendance = sum(item['attendance_percentage'] for item in report_data) / total_students if total_students > 0 else 0
+    absent_count = sum(1 for item in report_data if item['present_days'] == 0)
+    
+    statistics = {
+        'total_students': total_students,
+        'average_attendance': average_attendance,
+        'present_count': total_present_days,
+        'absent_count': absent_count,
+        'total_days': total_days,
+        'filtered_count': len(report_data)
+    }
+    
+    return report_data, statistics, filters
+
+def get_report_institute(db: Session, institute_id: str) -> Institute:
+    """Institute details for the report header"""
+    institute = db.query(Institute).filter(
+        Institute.institute_id == institute_id
+    ).first()
+    
+    if not institute:
+        raise HTTPException(
+            status_code=404,
+            detail="Institute not found"
+        )
+    return institute
+
 @router.post("/reports/generate")
 async def generate_attendance_report(
     class_filter: Optional[str] = None,
@@ -902,180 +1275,47 @@ async def generate_attendance_report(
     end_date: Optional[str] = Query(None, description="End date in DD-MM-YYYY format"),
     format: str = "excel",
     include_summary: bool = True,
+    indent: Optional[int] = Query(None, ge=0, le=8, description="JSON indentation, compact when omitted"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_institute_admin)
 ):
     """
     Generate and download attendance report in Excel, CSV, PDF or HTML format
     Accepts dates in DD-MM-YYYY format
+    For large reports use POST /reports/jobs instead
     """
     institute_id = admin_user.institute_id
     
     try:
-        # Parse dates from DD-MM-YYYY to date objects
-        def parse_date(date_str: Optional[str]) -> Optional[date]:
-            if not date_str:
-                return None
-            try:
-                # Try DD-MM-YYYY format
-                return datetime.strptime(date_str, "%d-%m-%Y").date()
-            except ValueError:
-                # Try YYYY-MM-DD format (for backward compatibility)
-                try:
-                    return datetime.strptime(date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Invalid date format: {date_str}. Use DD-MM-YYYY format"
-                    )
-        
-        parsed_date_filter = parse_date(date_filter)
-        parsed_start_date = parse_date(start_date)
-        parsed_end_date = parse_date(end_date)
-        
         # Get institute details for report header
-        institute = db.query(Institute).filter(
-            Institute.institute_id == institute_id
-        ).first()
-        
-        if not institute:
-            raise HTTPException(
-                status_code=404,
-                detail="Institute not found"
-            )
+        institute = get_report_institute(db, institute_id)
         
-        # Build student query
-        student_query = db.query(Student).filter(
-            Student.institute_id == institute_id,
-            Student.is_active == True,
-            Student.status == 'ACTIVE'
+        report_data, statistics, filters = build_attendance_report(
+            db, institute_id, institute.institute_name,
+            class_filter, stream_filter, date_filter, start_date, end_date
         )
         
-        # Apply filters
-        if class_filter:
-            student_query = student_query.filter(Student.standard == class_filter)
-        
-        if stream_filter:
-            student_query = student_query.filter(Student.stream == stream_filter)
-        
-        students = student_query.all()
-        
-        if not students:
-            # Return a 200 with empty data instead of error
-            report_gen = ReportGenerator(institute.institute_name)
-            
-            # Create empty data report
-            report_data = []
-            statistics = {
-                'total_students': 0,
-                'average_attendance': 0,
-                'present_count': 0,
-                'absent_count': 0,
-                'total_days': 0,
-                'filtered_count': 0
-            }
-            
-            filters = {
-                'class_filter': class_filter or 'All',
-                'stream_filter': stream_filter or 'All',
-                'date_filter': date_filter,
-                'start_date': start_date,
-                'end_date': end_date,
-                'institute_name': institute.institute_name
-            }
-            
-            # Generate empty report
-            content, content_type, filename = report_gen.generate_report(
-                data=report_data,
-                stats=statistics,
-                filters=filters,
-                format=format
-            )
-            
-            return Response(
-                content=content.getvalue(),
-                media_type=content_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"}
+        report_gen = ReportGenerator(institute.institute_name)
+        record_report_generation(db, institute_id)
+        
+        if format.lower() == 'html':
+            # HTML is rendered in chunks straight into the response
+            return StreamingResponse(
+                report_gen.iter_html_report(report_data, statistics, filters),
+                media_type="text/html",
+                headers={"Content-Disposition": f"attachment; filename={report_gen.report_filename('.html')}"}
             )
         
-        # Determine date range
-        if parsed_date_filter:
-            # Single date
-            start_date_obj = end_date_obj = parsed_date_filter
-            total_days = 1
-        elif parsed_start_date and parsed_end_date:
-            # Date range
-            start_date_obj = parsed_start_date
-            end_date_obj = parsed_end_date
-            total_days = (end_date_obj - start_date_obj).days + 1
-        else:
-            # Default: last 30 days
-            end_date_obj = date.today()
-            start_date_obj = end_date_obj - timedelta(days=29)
-            total_days = 30
-        
-        # Get attendance data for each student
-        report_data = []
-        total_present_days = 0
-        
-        for student in students:
-            # Get attendance records for this student in date range
-            attendance_query = db.query(Attendance).filter(
-                Attendance.student_id == student.student_id,
-                Attendance.attendance_date >= start_date_obj,
-                Attendance.attendance_date <= end_date_obj
+        if format.lower() == 'json':
+            # JSON is serialized in one pass straight into the response
+            return StreamingResponse(
+                report_gen.iter_json_report(report_data, statistics, filters, indent=indent),
+                media_type="application/json",
+                headers={"Content-Disposition": f"attachment; filename={report_gen.report_filename('.json')}"}
             )
-            
-            present_days = attendance_query.count()
-            
-            # Calculate attendance percentage
-            attendance_percentage = (present_days / total_days) * 100 if total_days > 0 else 0
-            
-            # Get last attendance date
-            last_attendance = attendance_query.order_by(Attendance.attendance_date.desc()).first()
-            
-            report_data.append({
-                'roll_no': student.roll_no,
-                'student_name': student.full_name,
-                'class_name': student.standard,
-                'stream': student.stream,
-                'attendance_percentage': attendance_percentage,
-                'present_days': present_days,
-                'total_days': total_days,
-                'last_attendance': last_attendance.attendance_date if last_attendance else None,
-                'email': student.email,
-                'phone': student.phone
-            })
-            
-            total_present_days += present_days
-        
-        # Calculate statistics
-        total_students = len(students)
-        average_attendance = sum(item['attendance_percentage'] for item in report_data) / total_students if total_students > 0 else 0
-        absent_count = sum(1 for item in report_data if item['present_days'] == 0)
-        
-        statistics = {
-            'total_students': total_students,
-            'average_attendance': average_attendance,
-            'present_count': total_present_days,
-            'absent_count': absent_count,
-            'total_days': total_days,
-            'filtered_count': len(report_data)
-        }
-        
-        filters = {
-            'class_filter': class_filter or 'All',
-            'stream_filter': stream_filter or 'All',
-            'date_filter': date_filter,
-            'start_date': start_date,
-            'end_date': end_date,
-            'institute_name': institute.institute_name
-        }
-        
-        report_gen = ReportGenerator(institute.institute_name)
         
-        # Generate report
-        content, content_type, filename = report_gen.generate_report(
+        # Generate report (PDFs render in the process pool)
+        content, content_type, filename = await report_gen.generate_report_async(
             data=report_data,
             stats=statistics,
             filters=filters,
@@ -1083,8 +1323,8 @@ async def generate_attendance_report(
         )
         
         # Return the file
-        return Response(
-            content=content.getvalue(),
+        return StreamingResponse(
+            iter_file(content),
             media_type=content_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
@@ -1099,6 +1339,120 @@ async def generate_attendance_report(
             detail=f"Error generating report: {str(e)}"
         )
 
+# ==================== REPORT JOBS API ====================
+@router.post("/reports/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    class_filter: Optional[str] = None,
+    stream_filter: Optional[str] = None,
+    date_filter: Optional[str] = Query(None, description="Date in DD-MM-YYYY format"),
+    start_date: Optional[str] = Query(None, description="Start date in DD-MM-YYYY format"),
+    end_date: Optional[str] = Query(None, description="End date in DD-MM-YYYY format"),
+    format: str = "excel",
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Queue an attendance report for background generation
+    Poll GET /reports/jobs/{job_id} and download when completed.
+    An identical request already in progress returns the existing job.
+    """
+    institute_id = admin_user.institute_id
+    
+    if format.lower() not in ReportGenerator.SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported report format: {format}"
+        )
+    
+    # Validate up front so bad input fails here and not in the job
+    start_date_obj, end_date_obj = resolve_report_period(date_filter, start_date, end_date)
+    institute_name = get_report_institute(db, institute_id).institute_name
+    
+    def render(set_progress):
+        job_db = SessionLocal()
+        try:
+            set_progress(10)
+            report_data, statistics, filters = build_attendance_report(
+                job_db, institute_id, institute_name,
+                class_filter, stream_filter, date_filter, start_date, end_date
+            )
+            set_progress(50)
+            return ReportGenerator(institute_name).generate_report(
+                data=report_data,
+                stats=statistics,
+                filters=filters,
+                format=format
+            )
+        finally:
+            job_db.close()
+    
+    record_report_generation(db, institute_id)
+    
+    job = report_jobs.submit(
+        institute_id,
+        format,
+        {
+            'class_filter': class_filter,
+            'stream_filter': stream_filter,
+            'date_filter': date_filter,
+            'start_date': start_date,
+            'end_date': end_date,
+            'period': [start_date_obj, end_date_obj]
+        },
+        render
+    )
+    
+    return job.to_dict()
+
+@router.get("/reports/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Report job status and progress
+    """
+    job = report_jobs.get(job_id, admin_user.institute_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Report job not found or expired"
+        )
+    
+    result = job.to_dict()
+    if job.status == "completed":
+        result['download_url'] = f"/api/admin/reports/jobs/{job.id}/download"
+    return result
+
+@router.get("/reports/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Download the file of a completed report job
+    """
+    job = report_jobs.get(job_id, admin_user.institute_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Report job not found or expired"
+        )
+    
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Report is not ready (status: {job.status})"
+        )
+    
+    return FileResponse(
+        job.path,
+        media_type=job.content_type,
+        filename=job.filename
+    )
+
 # Also update the preview endpoint
 @router.get("/reports/preview")
 async def preview_attendance_report(
@@ -1138,44 +1492,35 @@ async def preview_attendance_report(
         parsed_start_date = parse_date(start_date)
         parsed_end_date = parse_date(end_date)
         
-        # Build student query
-        student_query = db.query(Student).filter(
-            Student.institute_id == institute_id,
-            Student.is_active == True,
-            Student.status == 'ACTIVE'
-        )
-        
-        # Apply filters
-        if class_filter:
-            student_query = student_query.filter(Student.standard == class_filter)
-        
-        if stream_filter:
-            student_query = student_query.filter(Student.stream == stream_filter)
-        
-        students = student_query.limit(10).all()  # Limit to 10 for preview
-        
         # Determine date range
         if parsed_date_filter:
             start_date_obj = end_date_obj = parsed_date_filter
-            total_days = 1
         elif parsed_start_date and parsed_end_date:
             start_date_obj = parsed_start_date
             end_date_obj = parsed_end_date
-            total_days = (end_date_obj - start_date_obj).days + 1
         else:
             # Default: last 7 days
             end_date_obj = date.today()
             start_date_obj = end_date_obj - timedelta(days=6)
-            total_days = 7
+        
+        # Working days of the period (institute weekends and holidays excluded)
+        total_days = get_working_calendar(institute_id, db).count(start_date_obj, end_date_obj)
+        
+        # Limit to 10 for preview
+        students = get_student_attendance_summary(
+            db,
+            institute_id,
+            start_date_obj,
+            end_date_obj,
+            class_filter=class_filter,
+            stream_filter=stream_filter,
+            limit=10
+        )
         
         report_data = []
         
         for student in students:
-            attendance_count = db.query(Attendance).filter(
-                Attendance.student_id == student.student_id,
-                Attendance.attendance_date >= start_date_obj,
-                Attendance.attendance_date <= end_date_obj
-            ).count()
+            attendance_count = student.present_days
             
             attendance_percentage = (attendance_count / total_days) * 100 if total_days > 0 else 0
             
@@ -1206,6 +1551,120 @@ async def preview_attendance_report(
             detail=f"Error generating preview: {str(e)}"
         )
 
+# ==================== CALENDAR API ====================
+def build_calendar_response(db: Session, institute_id: str) -> dict:
+    """Weekends and holidays of an institute"""
+    work_calendar = get_working_calendar(institute_id, db)
+    
+    holidays = db.query(InstituteHoliday).filter(
+        InstituteHoliday.institute_id == institute_id
+    ).order_by(InstituteHoliday.holiday_date).all()
+    
+    return {
+        "weekmask": work_calendar.weekmask,
+        "weekend_days": [day for day in range(7) if work_calendar.weekmask[day] == "0"],
+        "holidays": [
+            {
+                "date": holiday.holiday_date.strftime("%Y-%m-%d"),
+                "name": holiday.name
+            }
+            for holiday in holidays
+        ]
+    }
+
+@router.get("/calendar")
+async def get_institute_calendar(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Get the institute's weekend days and holidays used for working-day counts
+    """
+    return build_calendar_response(db, admin_user.institute_id)
+
+@router.put("/calendar")
+async def update_institute_calendar(
+    calendar_update: CalendarUpdate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Set the institute's weekend days
+    """
+    institute_id = admin_user.institute_id
+    
+    settings = db.query(InstituteCalendar).filter(
+        InstituteCalendar.institute_id == institute_id
+    ).first()
+    
+    if not settings:
+        settings = InstituteCalendar(institute_id=institute_id)
+        db.add(settings)
+    
+    settings.weekmask = weekmask_from_weekend_days(calendar_update.weekend_days)
+    db.commit()
+    invalidate_working_calendar(institute_id)
+    
+    return build_calendar_response(db, institute_id)
+
+@router.post("/calendar/holidays", status_code=status.HTTP_201_CREATED)
+async def add_institute_holiday(
+    holiday_data: HolidayCreate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Add a holiday (or rename an existing one)
+    """
+    institute_id = admin_user.institute_id
+    
+    holiday = db.query(InstituteHoliday).filter(
+        InstituteHoliday.institute_id == institute_id,
+        InstituteHoliday.holiday_date == holiday_data.holiday_date
+    ).first()
+    
+    if holiday:
+        holiday.name = holiday_data.name
+    else:
+        db.add(InstituteHoliday(
+            institute_id=institute_id,
+            holiday_date=holiday_data.holiday_date,
+            name=holiday_data.name
+        ))
+    
+    db.commit()
+    invalidate_working_calendar(institute_id)
+    
+    return build_calendar_response(db, institute_id)
+
+@router.delete("/calendar/holidays/{holiday_date}")
+async def delete_institute_holiday(
+    holiday_date: date,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Remove a holiday
+    """
+    institute_id = admin_user.institute_id
+    
+    holiday = db.query(InstituteHoliday).filter(
+        InstituteHoliday.institute_id == institute_id,
+        InstituteHoliday.holiday_date == holiday_date
+    ).first()
+    
+    if not holiday:
+        raise HTTPException(
+            status_code=404,
+            detail="Holiday not found"
+        )
+    
+    db.delete(holiday)
+    db.commit()
+    invalidate_working_calendar(institute_id)
+    
+    return build_calendar_response(db, institute_id)
+
 # ==================== UTILITY API ====================
 @router.get("/classes")
 async def get_classes_list(
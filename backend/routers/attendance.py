@@ -0,0 +1,66 @@
+# routers/attendance.py
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, status
+
+from models.users import User
+from routers.auth import get_institute_admin
+from schemas.attendance import AttendanceEventBatch
+from utils.attendance_events import attendance_events
+
+router = APIRouter(
+    prefix="/api/attendance",
+    tags=["Attendance Events"]
+)
+
+@router.post("/events", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_attendance_events(
+    batch: AttendanceEventBatch,
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Accept a batch of face-recognition events.
+
+    Events are acknowledged before they are written: the response carries
+    the batch token (the Idempotency-Key header when sent) and the write
+    outcome is available from GET /api/attendance/events/{token}. Sending
+    the same Idempotency-Key again returns the first acknowledgement.
+    """
+    try:
+        event_batch, replayed = attendance_events.submit(
+            admin_user.institute_id, batch.events, idempotency_key
+        )
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Attendance event queue is full, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    return {
+        "success": True,
+        "replayed": replayed,
+        "data": event_batch.to_dict()
+    }
+
+@router.get("/events/{token}")
+async def get_attendance_event_batch(
+    token: str,
+    admin_user: User = Depends(get_institute_admin)
+):
+    """
+    Write outcome of an event batch
+    """
+    event_batch = attendance_events.get(admin_user.institute_id, token)
+
+    if not event_batch:
+        raise HTTPException(
+            status_code=404,
+            detail="Event batch not found or expired"
+        )
+
+    return {
+        "success": True,
+        "data": event_batch.to_dict()
+    }
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from typing import Optional
 from utils.jwt_handler import ACCESS_TOKEN_EXPIRE_MINUTES
 from database import get_db
 from models.users import User
 from schemas.auth import LoginSchema, TokenSchema
 from utils.jwt_handler import create_access_token, verify_token
-from utils.hashing import verify_password
+from utils.hashing import verify_password_async
+from utils.auth_cache import principal_cache
+from utils.usage_rollup import record_login
 from pydantic import BaseModel
 
 
@@ -19,13 +21,24 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
+    # Reuse the principal resolved (or cached) by auth_middleware for this request
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User account is inactive",
+            )
+        return user
+    
     token = credentials.credentials
     
-    # Verify token
-    payload = verify_token(token)
+    # Verify token (reuse the payload if the middleware already decoded it)
+    payload = getattr(request.state, "token_payload", None) or verify_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,6 +70,26 @@ async def get_current_user(
     
     return user
 
+async def get_current_db_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    ORM User row for endpoints that read columns outside the cached
+    principal or modify the user (served from the session identity map
+    when auth_middleware loaded it on this request)
+    """
+    if isinstance(current_user, User):
+        return current_user
+    
+    user = db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return user
+
 # Role-based dependency functions
 async def get_super_admin_user(
     current_user: User = Depends(get_current_user)
@@ -121,7 +154,7 @@ async def login(login_data: LoginSchema, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(login_data.password, user.password_hash):
+    if not await verify_password_async(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -141,7 +174,11 @@ async def login(login_data: LoginSchema, db: Session = Depends(get_db)):
     
     access_token = create_access_token(data=token_data)
     
+    # Count the login (and the user as active today) in the usage rollup
+    record_login(db, user.id, user.institute_id, date.today())
+    
     db.commit()
+    principal_cache.invalidate_user(user.id)
     
     # Determine redirect path based on role
     role_paths = {
@@ -165,34 +202,43 @@ async def login(login_data: LoginSchema, db: Session = Depends(get_db)):
 # Update logout function to use HTTP Bearer
 @router.post("/logout")
 def logout(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     token = credentials.credentials
     
-    # Verify token and get user
-    payload = verify_token(token)
-    if payload:
-        user_email = payload.get("sub")
+    # Reuse the user resolved by auth_middleware, else verify token and get user
+    user = getattr(request.state, "user", None)
+    if user is None:
+        payload = verify_token(token)
+        user_email = payload.get("sub") if payload else None
         if user_email:
             user = db.query(User).filter(User.email == user_email).first()
-            if user:
-                user.is_active = False
-                user.token_expiry = None
-                db.commit()
+    
+    if user:
+        user_id = user.id
+        if not isinstance(user, User):
+            user = db.get(User, user_id)
+        if user:
+            user.is_active = False
+            user.token_expiry = None
+            db.commit()
+        principal_cache.invalidate_user(user_id)
     
     return {"message": "Successfully logged out"}
 
 @router.get("/check-status/{user_id}")
 async def check_user_status(
     user_id: int,
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     """Check if a user is currently active/inactive"""
     
     # First authenticate the requesting user
-    await get_current_user(credentials, db)
+    await get_current_user(request, credentials, db)
     
     # Then check the target user status
     user = db.query(User).filter(User.id == user_id).first()
@@ -212,13 +258,14 @@ async def check_user_status(
 
 @router.get("/verify-token")
 def verify_user_token(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     token = credentials.credentials
     
-    # Verify token
-    payload = verify_token(token)
+    # Verify token (reuse the payload if the middleware already decoded it)
+    payload = getattr(request.state, "token_payload", None) or verify_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -232,7 +279,7 @@ def verify_user_token(
             detail="Invalid token payload",
         )
     
-    user = db.query(User).filter(User.email == user_email).first()
+    user = getattr(request.state, "user", None) or db.query(User).filter(User.email == user_email).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -19,6 +19,9 @@ from schemas.admin import FacultyDashboardStats, FacultyClassResponse, Dashboard
 from schemas.student import StudentCreate, StudentResponse
 from schemas.admin import FacultyStudentResponse
 from routers.auth import get_faculty_user
+from utils.attendance_stats import build_attendance_trend
+from utils.attendance_summary import record_student_attendance_removed, record_student_class_changed
+from utils.attendance_bitsets import attendance_bitsets
 
 router = APIRouter(
     prefix="/api/faculty",
@@ -259,10 +262,11 @@ async def get_faculty_dashboard_stats(
     institute_id = faculty.institute_id
     today = date.today()
     
-    # 1. Get faculty's assigned classes count
-    my_classes_count = db.query(FacultyClass).filter(
+    # 1. Get faculty's assigned classes
+    assigned_classes = db.query(FacultyClass).filter(
         FacultyClass.faculty_id == faculty.id
-    ).count()
+    ).order_by(FacultyClass.class_name).all()
+    my_classes_count = len(assigned_classes)
     
     # 2. Get faculty's assigned students count
     my_students_count = db.query(FacultyStudent).filter(
@@ -270,62 +274,31 @@ async def get_faculty_dashboard_stats(
         FacultyStudent.is_active == True
     ).count()
     
-    # 3. Get faculty's assigned student IDs
-    faculty_student_ids = db.query(FacultyStudent.student_id).filter(
-        FacultyStudent.faculty_id == faculty.id,
-        FacultyStudent.is_active == True
-    ).all()
-    faculty_student_ids = [fs[0] for fs in faculty_student_ids]
-    
-    # 4. Calculate today's attendance for faculty's students
-    if faculty_student_ids:
-        today_faculty_present = db.query(Attendance).filter(
-            Attendance.student_id.in_(faculty_student_ids),
-            Attendance.attendance_date == today
-        ).count()
-        
-        today_faculty_attendance_rate = (today_faculty_present / len(faculty_student_ids)) * 100
-        today_faculty_absent = len(faculty_student_ids) - today_faculty_present
+    # 3. Weekly trend for faculty's students (one grouped query through faculty_students)
+    weekly_trend = build_attendance_trend(
+        db,
+        my_students_count,
+        days=7,
+        end_date=today,
+        institute_id=institute_id,
+        faculty_id=faculty.id
+    )
+    
+    # 4. Today's attendance for faculty's students (last day of the trend)
+    today_faculty_present = weekly_trend[-1]["present"] if weekly_trend else 0
+    if my_students_count > 0:
+        today_faculty_attendance_rate = (today_faculty_present / my_students_count) * 100
+        today_faculty_absent = my_students_count - today_faculty_present
     else:
-        today_faculty_present = 0
         today_faculty_attendance_rate = 0
         today_faculty_absent = 0
     
-    # 5. Weekly trend for faculty's students
-    weekly_trend = []
-    for i in range(6, -1, -1):
-        day = today - timedelta(days=i)
-        
-        if faculty_student_ids:
-            day_faculty_present = db.query(Attendance).filter(
-                Attendance.student_id.in_(faculty_student_ids),
-                Attendance.attendance_date == day
-            ).count()
-            
-            day_rate = (day_faculty_present / len(faculty_student_ids)) * 100 if len(faculty_student_ids) > 0 else 0
-        else:
-            day_faculty_present = 0
-            day_rate = 0
-        
-        weekly_trend.append({
-            "date": day.strftime("%Y-%m-%d"),
-            "day_name": day.strftime("%A")[:3],
-            "attendance_rate": round(day_rate, 1),
-            "total": len(faculty_student_ids),
-            "present": day_faculty_present
-        })
-    
-    # 6. Calculate weekly average attendance
+    # 5. Calculate weekly average attendance
     weekly_average = 0
     if weekly_trend:
         total_rate = sum(day["attendance_rate"] for day in weekly_trend)
         weekly_average = total_rate / len(weekly_trend)
     
-    # 7. Get assigned classes
-    assigned_classes = db.query(FacultyClass).filter(
-        FacultyClass.faculty_id == faculty.id
-    ).order_by(FacultyClass.class_name).all()
-    
     assigned_classes_response = [
         FacultyClassResponse(
             class_name=fc.class_name,
@@ -340,7 +313,7 @@ async def get_faculty_dashboard_stats(
         today_attendance_rate=round(today_faculty_attendance_rate, 1),
         today_present=today_faculty_present,
         today_absent=today_faculty_absent,
-        today_total=len(faculty_student_ids),
+        today_total=my_students_count,
         weekly_average_attendance=round(weekly_average, 1),
         assigned_classes=assigned_classes_response,
         weekly_trend=weekly_trend
@@ -411,15 +384,22 @@ async def get_faculty_students(
         Student.roll_no
     ).offset(skip).limit(limit).all()
     
-    # Format response with attendance percentage
-    from utils.faculty_assignment import calculate_student_attendance_percentage
+    # Attendance percentage for the whole page in one grouped query
+    from utils.faculty_assignment import calculate_attendance_percentages
+    
+    end_date = date.today()
+    attendance_percentages = calculate_attendance_percentages(
+        [student.student_id for student in students],
+        end_date - timedelta(days=30),
+        end_date,
+        db,
+        faculty.institute_id
+    )
     
+    # Format response with attendance percentage
     result = []
     for student in students:
-        attendance_percentage = calculate_student_attendance_percentage(
-            student.student_id, 
-            db
-        )
+        attendance_percentage = attendance_percentages[student.student_id]
         
         result.append(FacultyStudentResponse(
             student_id=student.student_id,
@@ -499,6 +479,8 @@ async def update_student_by_faculty(
                 detail="Another student with this roll number already exists"
             )
     
+    old_standard, old_stream = student.standard, student.stream
+    
     # If name is being updated, we might want to update the image folder too
     if student_update.full_name != student.full_name:
         # Extract first name from updated full name
@@ -527,6 +509,9 @@ async def update_student_by_faculty(
     student.updated_at = datetime.utcnow()
     
     try:
+        # Keep the daily summary keyed by the student's current class/stream
+        record_student_class_changed(db, student, old_standard, old_stream)
+        
         db.commit()
         db.refresh(student)
         return student
@@ -596,7 +581,10 @@ async def delete_student_completely(
         }
         
         # Start transaction
-        # 1. Delete from attendance records first (child table)
+        # 1. Remove the student's attendance from the daily summary, then
+        #    delete attendance records (child table)
+        record_student_attendance_removed(db, student)
+        
         db.query(Attendance).filter(
             Attendance.student_id == student_id
         ).delete(synchronize_session=False)
@@ -613,6 +601,7 @@ async def delete_student_completely(
         
         # Commit all deletions
         db.commit()
+        attendance_bitsets.invalidate_student(student_id)
         
         return {
             "success": True,
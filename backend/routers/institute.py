@@ -4,11 +4,13 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 from passlib.context import CryptContext
-from utils.hashing import hash_password
+from utils.hashing import hash_password_pooled
 from database import get_db
 from models.institute import Institute
 from models.users import User
 from routers.auth import get_super_admin_user
+from utils.auth_cache import principal_cache
+from routers.super_admin import invalidate_dashboard_stats
 from schemas.institute import InstituteCreate, InstituteUpdate, InstituteResponse
 
 router = APIRouter(prefix="/institutes", tags=["Institute"])
@@ -69,7 +71,7 @@ def register_institute(data: InstituteCreate, db: Session = Depends(get_db)):
     # 3️⃣ Create Admin User for Institute
     admin_user = User(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=hash_password_pooled(data.password),
         role="ADMIN",
         institute_id=institute.institute_id,
         is_active=True
@@ -77,6 +79,7 @@ def register_institute(data: InstituteCreate, db: Session = Depends(get_db)):
 
     db.add(admin_user)
     db.commit()
+    invalidate_dashboard_stats()
 
     return {
         "message": "Institute registered successfully",
@@ -170,6 +173,8 @@ def deactivate_institute(institute_id: str, db: Session = Depends(get_db)):
         user.updated_at = datetime.utcnow()
     
     db.commit()
+    principal_cache.invalidate_institute(institute_id)
+    invalidate_dashboard_stats()
     
     return {
         "message": "Institute deactivated successfully",
@@ -193,6 +198,7 @@ def activate_institute(institute_id: str, db: Session = Depends(get_db)):
     institute.is_active = True
     institute.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_dashboard_stats()
     
     return {
         "message": "Institute activated successfully",
@@ -4,25 +4,18 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, extract, and_
 from datetime import datetime, date, timedelta
 import calendar
-from typing import Optional, List
+from typing import Optional
 from database import get_db
 from models import Attendance, Student, User
 from routers.auth import get_student_user
+from utils.school_calendar import WorkingCalendar, DEFAULT_CALENDAR, get_working_calendar
+from utils.attendance_bitsets import attendance_bitsets, academic_year_start
 
 router = APIRouter(prefix="/api/student", tags=["student"])
 
-def calculate_working_days(start_date: date, end_date: date) -> int:
-    """Calculate working days (Monday to Friday) between two dates"""
-    working_days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Monday = 0, Tuesday = 1, ..., Sunday = 6
-        if current_date.weekday() < 5:  # 0-4 are Monday to Friday
-            working_days += 1
-        current_date += timedelta(days=1)
-    
-    return working_days
+def calculate_working_days(start_date: date, end_date: date, work_calendar: Optional[WorkingCalendar] = None) -> int:
+    """Calculate working days between two dates (Monday to Friday unless the institute calendar says otherwise)"""
+    return (work_calendar or DEFAULT_CALENDAR).count(start_date, end_date)
 
 def get_month_boundaries(year: int, month: int):
     """Get first and last day of a month"""
@@ -32,12 +25,8 @@ def get_month_boundaries(year: int, month: int):
 
 def get_academic_year_start() -> date:
     """Get academic year start date (February 1st of current year)"""
-    current_year = datetime.now().year
     # If current month is January, academic year started last year February
-    if datetime.now().month == 1:
-        return date(current_year - 1, 2, 1)
-    else:
-        return date(current_year, 2, 1)
+    return academic_year_start(datetime.now().date())
 
 def should_count_as_absent(check_date: date) -> bool:
     """
@@ -66,48 +55,48 @@ def get_student_attendance_for_date_range(
     student_id: int, 
     start_date: date, 
     end_date: date, 
-    db: Session
+    db: Session,
+    work_calendar: Optional[WorkingCalendar] = None
 ) -> dict:
     """
     Get attendance data for a student in a date range
     Returns dict with present_dates and calculated absent_dates
     """
-    # Get all attendance records for the date range
-    attendance_records = db.query(Attendance).filter(
-        and_(
-            Attendance.student_id == student_id,
-            Attendance.attendance_date >= start_date,
-            Attendance.attendance_date <= end_date
-        )
-    ).all()
-    
-    # Get present dates as set
-    present_dates = {record.attendance_date for record in attendance_records}
+    # Get present dates as set (from the cached attendance bitsets)
+    present_dates = set(attendance_bitsets.present_dates(db, student_id, start_date, end_date))
     
+    return summarize_attendance_range(present_dates, start_date, end_date, work_calendar)
+
+def summarize_attendance_range(
+    present_dates: set,
+    start_date: date,
+    end_date: date,
+    work_calendar: Optional[WorkingCalendar] = None
+) -> dict:
+    """
+    Present and absent figures for a date range from a set of present dates
+    (no database access)
+    """
     # Calculate absent dates
     absent_dates = []
-    current_date = start_date
     current_datetime = datetime.now()
     
-    while current_date <= end_date:
-        # Only count working days (Monday-Friday)
-        if current_date.weekday() < 5:
-            # Check if it's a future date
-            is_future = current_date > current_datetime.date()
-            
-            # Check if student is absent
-            if current_date not in present_dates:
-                # Apply the rules for counting as absent
-                if should_count_as_absent(current_date):
-                    absent_dates.append(current_date)
-                # For today before 9 PM, we don't count as absent yet
-                elif current_date == current_datetime.date() and current_datetime.hour < 21:
-                    pass  # Don't count as absent yet
-                # Future dates are never absent
-                elif is_future:
-                    pass  # Don't count future dates as absent
-            
-        current_date += timedelta(days=1)
+    # Only count working days (from the institute calendar)
+    for current_date in (work_calendar or DEFAULT_CALENDAR).working_days(start_date, end_date):
+        # Check if it's a future date
+        is_future = current_date > current_datetime.date()
+        
+        # Check if student is absent
+        if current_date not in present_dates:
+            # Apply the rules for counting as absent
+            if should_count_as_absent(current_date):
+                absent_dates.append(current_date)
+            # For today before 9 PM, we don't count as absent yet
+            elif current_date == current_datetime.date() and current_datetime.hour < 21:
+                pass  # Don't count as absent yet
+            # Future dates are never absent
+            elif is_future:
+                pass  # Don't count future dates as absent
     
     return {
         "present_dates": present_dates,
@@ -123,6 +112,9 @@ async def get_student_attendance_stats(
 ):
     """
     Get comprehensive attendance statistics for student dashboard
+    
+    Every figure comes from the student's attendance bitsets, fetched once
+    (attendance from other workers shows up within ATTENDANCE_BITSET_TTL_SECONDS)
     """
     try:
         # Get student info using email
@@ -144,18 +136,25 @@ async def get_student_attendance_stats(
         # Get first and last day of current month
         first_day_of_month, last_day_of_month = get_month_boundaries(current_year, current_month)
         
+        # Working days, holidays and weekends of the student's institute
+        work_calendar = get_working_calendar(student.institute_id, db)
+        
         # Calculate total working days in current month
-        total_working_days = calculate_working_days(first_day_of_month, last_day_of_month)
+        total_working_days = calculate_working_days(first_day_of_month, last_day_of_month, work_calendar)
+        
+        # Attendance bitsets of the academic year and the last 4 weeks, fetched once
+        window_start = min(academic_start, current_date - timedelta(days=27))
+        attendance_bits = attendance_bitsets.student(db, student.student_id, window_start, current_date)
         
         # 1. Academic Year Statistics (from February to today)
-        academic_data = get_student_attendance_for_date_range(
-            student.student_id, 
-            academic_start, 
-            current_date, 
-            db
+        academic_data = summarize_attendance_range(
+            set(attendance_bits.present_dates(academic_start, current_date)),
+            academic_start,
+            current_date,
+            work_calendar
         )
         
-        academic_working_days = calculate_working_days(academic_start, current_date)
+        academic_working_days = calculate_working_days(academic_start, current_date, work_calendar)
         academic_attendance_percent = 0
         if academic_working_days > 0:
             academic_attendance_percent = round(
@@ -164,11 +163,12 @@ async def get_student_attendance_stats(
             )
         
         # 2. Current Month Statistics
-        month_data = get_student_attendance_for_date_range(
-            student.student_id,
+        month_end = min(current_date, last_day_of_month)  # Don't include future dates
+        month_data = summarize_attendance_range(
+            set(attendance_bits.present_dates(first_day_of_month, month_end)),
             first_day_of_month,
-            min(current_date, last_day_of_month),  # Don't include future dates
-            db
+            month_end,
+            work_calendar
         )
         
         month_present_days = month_data["present_count"]
@@ -177,7 +177,8 @@ async def get_student_attendance_stats(
         # Calculate working days so far (excluding future dates)
         month_working_days_so_far = calculate_working_days(
             first_day_of_month, 
-            min(current_date, last_day_of_month)
+            month_end,
+            work_calendar
         )
         
         month_attendance_percent = 0
@@ -193,29 +194,33 @@ async def get_student_attendance_stats(
             week_end = current_date - timedelta(days=week_offset * 7)
             week_start = week_end - timedelta(days=6)
             
-            week_data = get_student_attendance_for_date_range(
-                student.student_id,
-                week_start,
-                week_end,
-                db
-            )
+            week_present_days = attendance_bits.count(week_start, week_end)
             
-            week_working_days = calculate_working_days(week_start, week_end)
+            week_working_days = calculate_working_days(week_start, week_end, work_calendar)
             week_percent = 0
             if week_working_days > 0:
-                week_percent = round((week_data["present_count"] / week_working_days) * 100, 1)
+                week_percent = round((week_present_days / week_working_days) * 100, 1)
             
             weekly_data.append({
                 "week": f"Week {4-week_offset}",
                 "attendance_percent": week_percent,
-                "present_days": week_data["present_count"],
+                "present_days": week_present_days,
                 "working_days": week_working_days
             })
         
-        # 4. Recent Attendance (last 7 records)
-        recent_attendance = db.query(Attendance).filter(
+        # 4. Recent Attendance (last 7 records): dates from the bitsets, time in
+        #    (not kept in the bitsets) read for those dates only
+        recent_dates = attendance_bits.present_dates(window_start, current_date)[-7:]
+        recent_query = db.query(
+            Attendance.attendance_date,
+            Attendance.created_at
+        ).filter(
             Attendance.student_id == student.student_id
-        ).order_by(Attendance.attendance_date.desc()).limit(7).all()
+        )
+        if len(recent_dates) == 7:
+            recent_query = recent_query.filter(Attendance.attendance_date.in_(recent_dates))
+        # Fewer than 7 in the window: older records may exist, look them up
+        recent_attendance = recent_query.order_by(Attendance.attendance_date.desc()).limit(7).all()
         
         recent_attendance_list = []
         for record in recent_attendance:
@@ -233,18 +238,13 @@ async def get_student_attendance_stats(
         streak = 0
         check_date = current_date
         while True:
-            # Skip weekends for streak calculation
-            if check_date.weekday() >= 5:  # Saturday or Sunday
+            # Skip weekends and holidays for streak calculation
+            if not work_calendar.is_working_day(check_date):
                 check_date -= timedelta(days=1)
                 continue
             
             # Check if student was present on this day
-            was_present = db.query(Attendance).filter(
-                and_(
-                    Attendance.student_id == student.student_id,
-                    Attendance.attendance_date == check_date
-                )
-            ).first()
+            was_present = attendance_bits.is_present(check_date)
             
             if was_present:
                 streak += 1
@@ -353,12 +353,15 @@ async def get_student_attendance_records(
         # Don't include future dates
         end_date = min(last_day, current_date)
         
+        work_calendar = get_working_calendar(student.institute_id, db)
+        
         # Get attendance data for the date range
         attendance_data = get_student_attendance_for_date_range(
             student.student_id,
             first_day,
             end_date,
-            db
+            db,
+            work_calendar
         )
         
         # Combine present and absent records
@@ -384,7 +387,7 @@ async def get_student_attendance_records(
                 "recorded_by": "Face Recognition System",
                 "remarks": "Automated attendance via face recognition",
                 "institute_id": record.institute_id,
-                "is_working_day": record.attendance_date.weekday() < 5
+                "is_working_day": work_calendar.is_working_day(record.attendance_date)
             })
         
         # Add absent records (only for working days)
@@ -476,12 +479,15 @@ async def get_monthly_attendance_calendar(
         # Don't include future dates
         end_date = min(last_day, current_date)
         
+        work_calendar = get_working_calendar(student.institute_id, db)
+        
         # Get attendance data for the month
         attendance_data = get_student_attendance_for_date_range(
             student.student_id,
             first_day,
             end_date,
-            db
+            db,
+            work_calendar
         )
         
         # Get all attendance records for the month
@@ -499,8 +505,9 @@ async def get_monthly_attendance_calendar(
         
         # Generate calendar for entire month
         while check_date <= last_day:
-            is_working_day = check_date.weekday() < 5
-            is_weekend = check_date.weekday() >= 5
+            is_working_day = work_calendar.is_working_day(check_date)
+            is_weekend = work_calendar.is_weekend(check_date)
+            is_holiday = work_calendar.is_holiday(check_date)
             is_today = check_date == current_date
             is_future = check_date > current_date
             is_past = check_date < current_date
@@ -521,6 +528,8 @@ async def get_monthly_attendance_calendar(
                 status = "FUTURE"
             elif is_weekend:
                 status = "WEEKEND"
+            elif is_holiday:
+                status = "HOLIDAY"
             elif check_date == current_date and current_datetime.hour < 21:
                 # Today before 9 PM - attendance not yet determined
                 status = "PENDING"
@@ -533,6 +542,7 @@ async def get_monthly_attendance_calendar(
                 "day": check_date.day,
                 "day_name": check_date.strftime("%A"),
                 "is_weekend": is_weekend,
+                "is_holiday": is_holiday,
                 "is_today": is_today,
                 "is_future": is_future,
                 "is_working_day": is_working_day,
@@ -544,7 +554,7 @@ async def get_monthly_attendance_calendar(
             check_date += timedelta(days=1)
         
         # Calculate month statistics (only for dates up to today)
-        working_days = calculate_working_days(first_day, end_date)
+        working_days = calculate_working_days(first_day, end_date, work_calendar)
         present_days = attendance_data["present_count"]
         absent_days = attendance_data["absent_count"]
         
@@ -599,15 +609,18 @@ async def get_student_profile(
         current_date = datetime.now()
         first_day_of_month = date(current_date.year, current_date.month, 1)
         
+        work_calendar = get_working_calendar(student.institute_id, db)
+        
         month_data = get_student_attendance_for_date_range(
             student.student_id,
             first_day_of_month,
             current_date.date(),
-            db
+            db,
+            work_calendar
         )
         
         # Calculate working days so far this month
-        working_days_so_far = calculate_working_days(first_day_of_month, current_date.date())
+        working_days_so_far = calculate_working_days(first_day_of_month, current_date.date(), work_calendar)
         month_percent = 0
         if working_days_so_far > 0:
             month_percent = round((month_data["present_count"] / working_days_so_far) * 100, 1)
@@ -618,10 +631,11 @@ async def get_student_profile(
             student.student_id,
             academic_start,
             current_date.date(),
-            db
+            db,
+            work_calendar
         )
         
-        academic_working_days = calculate_working_days(academic_start, current_date.date())
+        academic_working_days = calculate_working_days(academic_start, current_date.date(), work_calendar)
         academic_percent = 0
         if academic_working_days > 0:
             academic_percent = round((academic_data["present_count"] / academic_working_days) * 100, 1)
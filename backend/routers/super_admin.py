@@ -5,16 +5,55 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 import pandas as pd
 from io import BytesIO
+import os
+import time
 
 from database import get_db
 from models.users import User
 from models.institute import Institute
+from models.institute_daily_usage import InstituteDailyUsage
 from routers.auth import get_super_admin_user
+from utils.auth_cache import principal_cache
+from utils.usage_rollup import USAGE_COUNTERS
 
 router = APIRouter(prefix="/api/super-admin", tags=["Super Admin"])
 
 
 
+# Seconds the dashboard aggregate is reused (the UI polls it)
+DASHBOARD_STATS_CACHE_SECONDS = int(os.getenv("DASHBOARD_STATS_CACHE_SECONDS", "30"))
+
+_dashboard_stats_cache = {"expires_at": 0.0, "data": None}
+
+
+def invalidate_dashboard_stats() -> None:
+    """Drop the cached dashboard aggregate (institute or user added, removed or toggled)"""
+    _dashboard_stats_cache["expires_at"] = 0.0
+
+
+def count_where(condition, use_filter: bool):
+    """COUNT(*) FILTER (WHERE condition), or SUM(CASE ...) where FILTER is not supported"""
+    if use_filter:
+        return func.count().filter(condition)
+    return func.sum(case((condition, 1), else_=0))
+
+
+def sum_where(value, condition, use_filter: bool):
+    """SUM(value) FILTER (WHERE condition), or SUM(CASE ...) where FILTER is not supported"""
+    if use_filter:
+        return func.sum(value).filter(condition)
+    return func.sum(case((condition, value), else_=None))
+
+
+def plan_amount(monthly_plan: str, annual_plan: str):
+    """Subscription price of an institute for the given plan names"""
+    return case(
+        (Institute.subscription_plan == monthly_plan, 5000),
+        (Institute.subscription_plan == annual_plan, 50000),
+        else_=0
+    )
+
+
 @router.get("/dashboard-stats")
 async def get_dashboard_stats(
     current_user: User = Depends(get_super_admin_user),
@@ -22,58 +61,86 @@ async def get_dashboard_stats(
 ):
     """Get dashboard statistics for super admin"""
     
-    # Total institutes
-    total_institutes = db.query(Institute).count()
+    if _dashboard_stats_cache["data"] is not None and _dashboard_stats_cache["expires_at"] > time.time():
+        return _dashboard_stats_cache["data"]
     
-    # Active/Inactive institutes - based on payment status
-    active_institutes = db.query(Institute).filter(
-        Institute.payment_status == "PAID"
-    ).count()
-    inactive_institutes = total_institutes - active_institutes
+    # FILTER (WHERE ...) on PostgreSQL and SQLite, SUM(CASE ...) elsewhere
+    use_filter = db.get_bind().dialect.name in ("postgresql", "sqlite")
     
-    # Total users by role
-    total_users = db.query(User).count()
-    admin_count = db.query(User).filter(User.role == "ADMIN").count()
-    faculty_count = db.query(User).filter(User.role == "FACULTY").count()
-    student_count = db.query(User).filter(User.role == "STUDENT").count()
-    
-    # Monthly revenue - FIXED to use correct plan names
     current_month = datetime.now().month
     current_year = datetime.now().year
     
-    monthly_revenue = db.query(
-        func.sum(
-            case(
-                (Institute.subscription_plan == "monthly", 5000),  
-                (Institute.subscription_plan == "annual", 50000),  
-                else_=0
-            )
-        )
-    ).filter(
-        Institute.payment_status == "PAID",
-        func.extract('month', Institute.created_at) == current_month,
-        func.extract('year', Institute.created_at) == current_year
-    ).scalar() or 0
-    
-    # Growth calculations - calculate actual growth
     first_day_current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     last_month = first_day_current_month - timedelta(days=1)
     last_month_year = last_month.year
     last_month_month = last_month.month
     
-    last_month_revenue = db.query(
-        func.sum(
-            case(
-                (Institute.subscription_plan == "Monthly", 5000),
-                (Institute.subscription_plan == "Annual", 50000),
-                else_=0
-            )
-        )
-    ).filter(
-        Institute.payment_status == "PAID",
-        func.extract('month', Institute.created_at) == last_month_month,
-        func.extract('year', Institute.created_at) == last_month_year
-    ).scalar() or 0
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    
+    paid = Institute.payment_status == "PAID"
+    pending = Institute.payment_status == "PENDING"
+    created_month = func.extract('month', Institute.created_at)
+    created_year = func.extract('year', Institute.created_at)
+    
+    # 1. Every institute figure in one pass over institute_details
+    institute_stats = db.query(
+        func.count().label("total_institutes"),
+        count_where(paid, use_filter).label("active_institutes"),
+        # Monthly revenue - FIXED to use correct plan names
+        sum_where(
+            plan_amount("monthly", "annual"),
+            and_(paid, created_month == current_month, created_year == current_year),
+            use_filter
+        ).label("monthly_revenue"),
+        sum_where(
+            plan_amount("Monthly", "Annual"),
+            and_(paid, created_month == last_month_month, created_year == last_month_year),
+            use_filter
+        ).label("last_month_revenue"),
+        # Subscription distribution - FIXED plan names
+        count_where(and_(Institute.subscription_plan == "monthly", paid), use_filter).label("monthly_plan"),
+        count_where(and_(Institute.subscription_plan == "annual", paid), use_filter).label("annual_plan"),
+        # Pending payments - only count institutes with PENDING status
+        count_where(pending, use_filter).label("pending_payments"),
+        # Calculate actual pending amount based on subscription plan
+        sum_where(plan_amount("Monthly", "Annual"), pending, use_filter).label("pending_amount"),
+        # Institute growth (last 30 days and the 30 days before)
+        count_where(Institute.created_at >= thirty_days_ago, use_filter).label("new_institutes"),
+        count_where(
+            and_(
+                Institute.created_at >= (thirty_days_ago - timedelta(days=30)),
+                Institute.created_at < thirty_days_ago
+            ),
+            use_filter
+        ).label("prev_month_institutes"),
+        # AI usage - total attendance events recorded, read from the usage rollup
+        db.query(
+            func.coalesce(func.sum(InstituteDailyUsage.attendance_events), 0)
+        ).scalar_subquery().label("ai_usage")
+    ).one()
+    
+    # 2. Total users by role in one pass over users
+    user_stats = db.query(
+        func.count().label("total_users"),
+        count_where(User.role == "ADMIN", use_filter).label("admin_count"),
+        count_where(User.role == "FACULTY", use_filter).label("faculty_count"),
+        count_where(User.role == "STUDENT", use_filter).label("student_count")
+    ).one()
+    
+    # Total institutes
+    total_institutes = institute_stats.total_institutes
+    
+    # Active/Inactive institutes - based on payment status
+    active_institutes = institute_stats.active_institutes or 0
+    inactive_institutes = total_institutes - active_institutes
+    
+    total_users = user_stats.total_users
+    admin_count = user_stats.admin_count or 0
+    faculty_count = user_stats.faculty_count or 0
+    student_count = user_stats.student_count or 0
+    
+    monthly_revenue = institute_stats.monthly_revenue or 0
+    last_month_revenue = institute_stats.last_month_revenue or 0
     
     revenue_growth = 0
     if last_month_revenue > 0:
@@ -81,62 +148,27 @@ async def get_dashboard_stats(
     elif monthly_revenue > 0:
         revenue_growth = 100  # First time revenue
     
-    # Subscription distribution - FIXED plan names
-    monthly_plan = db.query(Institute).filter(
-        Institute.subscription_plan == "monthly",  
-        Institute.payment_status == "PAID"  
-    ).count()
-    
-    annual_plan = db.query(Institute).filter(
-        Institute.subscription_plan == "annual",  
-        Institute.payment_status == "PAID"
-    ).count()
-    
+    monthly_plan = institute_stats.monthly_plan or 0
+    annual_plan = institute_stats.annual_plan or 0
     active_subscriptions = monthly_plan + annual_plan
     
-    # Pending payments - only count institutes with PENDING status
-    pending_payments = db.query(Institute).filter(
-        Institute.payment_status == "PENDING"
-    ).count()
+    pending_payments = institute_stats.pending_payments or 0
+    pending_amount = institute_stats.pending_amount or 0
     
-    # Calculate actual pending amount based on subscription plan
-    pending_amount_query = db.query(
-        func.sum(
-            case(
-                (Institute.subscription_plan == "Monthly", 5000),
-                (Institute.subscription_plan == "Annual", 50000),
-                else_=0
-            )
-        )
-    ).filter(
-        Institute.payment_status == "PENDING"
-    ).scalar() or 0
-    
-    pending_amount = pending_amount_query
-    
-    # AI usage - get actual recognition count from your AI logs
-    # Assuming you have an AIRecognitionLog table
-        # Fallback placeholder
-    ai_usage = total_users * 50
+    ai_usage = institute_stats.ai_usage or 0
     
     # AI accuracy - placeholder, implement based on your actual accuracy tracking
     ai_accuracy = 96.7  # You should calculate this from actual recognition logs
     
     # Institute growth (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    new_institutes = db.query(Institute).filter(
-        Institute.created_at >= thirty_days_ago
-    ).count()
+    new_institutes = institute_stats.new_institutes or 0
     
     institute_growth = 0
     if total_institutes > 0:
         institute_growth = (new_institutes / total_institutes * 100)
     
     # Calculate revenue growth for institutes
-    prev_month_institutes = db.query(Institute).filter(
-        Institute.created_at >= (thirty_days_ago - timedelta(days=30)),
-        Institute.created_at < thirty_days_ago
-    ).count()
+    prev_month_institutes = institute_stats.prev_month_institutes or 0
     
     institute_growth_value = 0
     if prev_month_institutes > 0:
@@ -144,7 +176,7 @@ async def get_dashboard_stats(
     elif new_institutes > 0:
         institute_growth_value = 100
     
-    return {
+    stats = {
         "total_institutes": total_institutes,
         "active_institutes": active_institutes,
         "inactive_institutes": inactive_institutes,
@@ -163,6 +195,11 @@ async def get_dashboard_stats(
         "ai_accuracy": round(ai_accuracy, 1),
         "institute_growth": round(institute_growth_value, 1)
     }
+    
+    _dashboard_stats_cache["data"] = stats
+    _dashboard_stats_cache["expires_at"] = time.time() + DASHBOARD_STATS_CACHE_SECONDS
+    
+    return stats
 
 @router.get("/monthly-registrations")
 async def get_monthly_registrations(
@@ -250,17 +287,78 @@ async def get_institute_usage(
     current_user: User = Depends(get_super_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get institute-wise AI usage (simplified)"""
-    
-    # Get top 10 institutes by student count (as proxy for usage)
-    institutes = db.query(Institute).order_by(
-        desc(Institute.student_count)
+    """Get institute-wise AI usage (recognitions in the last N days)"""
+    
+    start_date = datetime.now().date() - timedelta(days=days - 1)
+    recognitions = func.coalesce(func.sum(InstituteDailyUsage.attendance_events), 0)
+    
+    # Top 10 institutes by recognitions, read from the usage rollup
+    institutes = db.query(
+        Institute.institute_name,
+        recognitions.label("recognitions")
+    ).outerjoin(
+        InstituteDailyUsage,
+        and_(
+            InstituteDailyUsage.institute_id == Institute.institute_id,
+            InstituteDailyUsage.usage_date >= start_date
+        )
+    ).group_by(
+        Institute.institute_id,
+        Institute.institute_name
+    ).order_by(
+        desc(recognitions)
     ).limit(10).all()
     
     return {
         "labels": [inst.institute_name[:20] + "..." if len(inst.institute_name) > 20 else inst.institute_name 
                    for inst in institutes],
-        "values": [inst.student_count * 10 for inst in institutes]  # Placeholder
+        "values": [int(inst.recognitions) for inst in institutes]
+    }
+
+@router.get("/usage-trend")
+async def get_usage_trend(
+    days: int = Query(30, ge=7, le=365),
+    institute_id: Optional[str] = Query(None),
+    current_user: User = Depends(get_super_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Daily platform usage (or one institute's) for the last N days, from the usage rollup"""
+    
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days - 1)
+    
+    query = db.query(
+        InstituteDailyUsage.usage_date,
+        func.sum(InstituteDailyUsage.attendance_events).label("attendance_events"),
+        func.sum(InstituteDailyUsage.active_users).label("active_users"),
+        func.sum(InstituteDailyUsage.logins).label("logins"),
+        func.sum(InstituteDailyUsage.report_generations).label("report_generations")
+    ).filter(
+        InstituteDailyUsage.usage_date >= start_date,
+        InstituteDailyUsage.usage_date <= end_date
+    )
+    
+    if institute_id:
+        query = query.filter(InstituteDailyUsage.institute_id == institute_id)
+    
+    usage_by_date = {
+        row.usage_date: row
+        for row in query.group_by(InstituteDailyUsage.usage_date)
+    }
+    
+    # Every day in range, zero where nothing was recorded
+    labels = []
+    series = {name: [] for name in USAGE_COUNTERS}
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        labels.append(day.strftime("%d %b"))
+        row = usage_by_date.get(day)
+        for name in USAGE_COUNTERS:
+            series[name].append(int(getattr(row, name) or 0) if row else 0)
+    
+    return {
+        "labels": labels,
+        **series
     }
 
 
@@ -334,6 +432,7 @@ async def toggle_institute_status(
         institute.payment_status = "PAID"
     
     db.commit()
+    invalidate_dashboard_stats()
     
     return {
         "message": f"Institute {'activated' if institute.payment_status == 'PAID' else 'deactivated'}",
@@ -357,6 +456,7 @@ async def toggle_user_status(
     
     user.is_active = not user.is_active
     db.commit()
+    principal_cache.invalidate_user(user.id)
     
     return {
         "message": f"User {'activated' if user.is_active else 'deactivated'}",
@@ -381,9 +481,10 @@ async def reset_user_password(
     temp_password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
     
     # Hash and update password (you'll need to import hash_password)
-    from utils.hashing import hash_password
-    user.password_hash = hash_password(temp_password)
+    from utils.hashing import hash_password_async
+    user.password_hash = await hash_password_async(temp_password)
     db.commit()
+    principal_cache.invalidate_user(user.id)
     
     # In production, send email with temp password
     return {
@@ -392,6 +493,13 @@ async def reset_user_password(
         "email": user.email
     }
 
+@router.get("/auth-cache-stats")
+async def get_auth_cache_stats(
+    current_user: User = Depends(get_super_admin_user)
+):
+    """Hit/miss counters of this worker's authenticated principal cache"""
+    return principal_cache.stats()
+
 @router.get("/export/institutes")
 async def export_institutes(
     format: str = Query("excel", regex="^(excel|csv|pdf)$"),
@@ -11,8 +11,12 @@ from models.faculty import Faculty
 from models.institute import Institute
 from models.student import Student
 from schemas.users import UserCreate, UserProfileResponse, EmailUpdate, PasswordChange
-from routers.auth import get_current_user
-from utils.hashing import hash_password, verify_password
+from routers.auth import get_current_db_user
+from utils.auth_cache import principal_cache
+from routers.super_admin import invalidate_dashboard_stats
+from utils.hashing import hash_password_pooled, verify_password_pooled
+from utils.attendance_summary import record_student_attendance_removed
+from utils.attendance_bitsets import attendance_bitsets
 
 router = APIRouter(
     prefix="/users",
@@ -82,7 +86,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     new_user = User(
         email=user.email,
-        password_hash=hash_password(user.password),
+        password_hash=hash_password_pooled(user.password),
         role=user.role,
         institute_id=user.institute_id,
         is_active=user.is_active if user.is_active is not None else True
@@ -91,6 +95,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     try:
         db.add(new_user)
         db.commit()
+        invalidate_dashboard_stats()
         db.refresh(new_user)
         
         # Link user_id to student_details table for STUDENT role
@@ -140,7 +145,7 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 @router.get("/profile", response_model=UserProfileResponse)
 def get_user_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -210,7 +215,7 @@ def get_user_profile(
 @router.put("/profile/email")
 def update_user_email(
     email_update: EmailUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -301,6 +306,7 @@ def update_user_email(
         
         # Commit all changes
         db.commit()
+        principal_cache.invalidate_user(current_user.id)
         
         # Refresh the current_user object to get updated data
         db.refresh(current_user)
@@ -328,7 +334,7 @@ def update_user_email(
 @router.post("/profile/change-password")
 def change_password(
     password_change: PasswordChange,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -374,23 +380,24 @@ def change_password(
         )
     
     # Verify current password
-    if not verify_password(password_change.current_password, current_user.password_hash):
+    if not verify_password_pooled(password_change.current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Check if new password is same as current password
-    if verify_password(password_change.new_password, current_user.password_hash):
+    if verify_password_pooled(password_change.new_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
         )
     
     # Update password
-    current_user.password_hash = hash_password(password_change.new_password)
+    current_user.password_hash = hash_password_pooled(password_change.new_password)
     current_user.updated_at = datetime.utcnow()
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     
     return {
         "success": True,
@@ -400,7 +407,7 @@ def change_password(
 @router.delete("/profile/delete-account", status_code=status.HTTP_200_OK)
 def delete_user_account(
     confirmation: str = None,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_db_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -431,9 +438,24 @@ def delete_user_account(
                     detail="Cannot delete the last SUPER_ADMIN account"
                 )
         
-        # First, delete the user
+        # Student profiles (and their attendance) go with the user through
+        # FK cascades; take that attendance out of the daily summary first
+        student_profiles = db.query(Student).filter(
+            (Student.user_id == current_user.id) | (Student.email == current_user.email)
+        ).all()
+        student_ids = []
+        for student in student_profiles:
+            record_student_attendance_removed(db, student)
+            student_ids.append(student.student_id)
+        
+        # Then delete the user
+        user_id = current_user.id
         db.delete(current_user)
         db.commit()
+        principal_cache.invalidate_user(user_id)
+        invalidate_dashboard_stats()
+        for student_id in student_ids:
+            attendance_bitsets.invalidate_student(student_id)
         
         return {
             "success": True,
@@ -221,19 +221,37 @@ class WeeklyTrendItem(BaseModel):
     total: int
     present: int
 
+# Calendar Schemas
+class CalendarUpdate(BaseModel):
+    weekend_days: List[int] = Field(default=[5, 6])  # 0=Monday ... 6=Sunday
+    
+    @validator('weekend_days')
+    def validate_weekend_days(cls, v):
+        if any(day < 0 or day > 6 for day in v):
+            raise ValueError("Weekend days must be between 0 (Monday) and 6 (Sunday)")
+        if len(set(v)) == 7:
+            raise ValueError("At least one working day is required")
+        return sorted(set(v))
+
+class HolidayCreate(BaseModel):
+    holiday_date: date
+    name: Optional[str] = None
+
 # Export Schemas
 class ExportRequest(BaseModel):
     report_type: str  # 'attendance', 'students', 'faculty'
     start_date: Optional[date] = None
     end_date: Optional[date] = None
     batch: Optional[str] = None
-    format: str = "excel"  # excel, csv, pdf
+    format: str = "excel"  # excel, csv, parquet, arrow
 
 class ExportFormat(str, Enum):
     PDF = "pdf"
     EXCEL = "excel"
     CSV = "csv"
     HTML = "html"
+    PARQUET = "parquet"
+    ARROW = "arrow"
     
 class AttendanceReportRequest(BaseModel):
     class_filter: Optional[str] = None
@@ -0,0 +1,13 @@
+# schemas/attendance.py
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+class AttendanceEvent(BaseModel):
+    student_id: int
+    timestamp: datetime  # Time of recognition, its date is the attendance date
+    institute_id: str
+    confidence: float = Field(..., ge=0, le=1)
+
+class AttendanceEventBatch(BaseModel):
+    events: List[AttendanceEvent] = Field(..., min_items=1)
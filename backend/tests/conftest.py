@@ -0,0 +1,196 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Point database.py at a throwaway SQLite file before anything imports it
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="neuroface-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from database import engine, Base, SessionLocal
+import main
+
+# Import your models
+from models.institute import Institute
+from models.users import User
+from models.student import Student
+from models.attendance import Attendance
+from utils.jwt_handler import create_access_token
+from utils.auth_cache import principal_cache
+from utils.attendance_bitsets import attendance_bitsets
+from utils.school_calendar import _calendar_cache
+from routers.super_admin import invalidate_dashboard_stats
+
+INSTITUTE_ID = "INST001"
+ADMIN_ID = 1
+ADMIN_EMAIL = "admin@inst001.test"
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running volume test (deselect with -m 'not slow')")
+
+
+class QueryCounter:
+    """Records every SQL statement sent through the engine while attached"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def matching(self, text: str) -> list:
+        return [statement for statement in self.statements if text in statement]
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+class CheckoutCounter:
+    """Counts connections checked out of the engine's pool while attached"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, dbapi_connection, connection_record, connection_proxy):
+        self.count += 1
+
+    def reset(self) -> None:
+        self.count = 0
+
+
+def auth_headers(email: str, user_id: int, role: str) -> dict:
+    token = create_access_token({"sub": email, "user_id": user_id, "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_students(db, count: int, start_id: int = 1, institute_id: str = INSTITUTE_ID,
+                 standard: str = "10th", stream: str = "Science") -> list:
+    """Bulk insert active students; returns their ids"""
+    student_ids = list(range(start_id, start_id + count))
+    db.execute(insert(Student), [
+        {
+            "student_id": student_id,
+            "full_name": f"Student {student_id}",
+            "roll_no": f"R{student_id:05d}",
+            "standard": standard,
+            "stream": stream,
+            "institute_id": institute_id,
+            "email": f"student{student_id}@inst001.test",
+            "status": "ACTIVE",
+            "is_active": True
+        }
+        for student_id in student_ids
+    ])
+    db.commit()
+    return student_ids
+
+
+def add_attendance(db, student_ids: list, attendance_dates: list, institute_id: str = INSTITUTE_ID) -> None:
+    db.execute(insert(Attendance), [
+        {
+            "student_id": student_id,
+            "attendance_date": attendance_date,
+            "institute_id": institute_id,
+            "created_at": datetime(attendance_date.year, attendance_date.month, attendance_date.day, 9, 0)
+        }
+        for attendance_date in attendance_dates
+        for student_id in student_ids
+    ])
+    db.commit()
+
+
+def _clear_tables() -> None:
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+def _clear_caches() -> None:
+    principal_cache.clear()
+    attendance_bitsets.clear()
+    _calendar_cache.clear()
+    invalidate_dashboard_stats()
+
+
+@pytest.fixture
+def db():
+    _clear_tables()
+    _clear_caches()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        _clear_tables()
+        _clear_caches()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def queries():
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def checkouts():
+    counter = CheckoutCounter()
+    event.listen(engine, "checkout", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "checkout", counter)
+
+
+@pytest.fixture
+def institute(db):
+    """One institute with an ADMIN user"""
+    db.add(Institute(
+        institute_id=INSTITUTE_ID,
+        institute_name="Test Institute",
+        address="1 Test Road",
+        email="office@inst001.test",
+        phone="0000000000",
+        institute_type="School",
+        student_count=0,
+        contact_person="Principal",
+        subscription_plan="monthly",
+        payment_method="card"
+    ))
+    db.add(User(
+        id=ADMIN_ID,
+        email=ADMIN_EMAIL,
+        password_hash="unused",
+        role="ADMIN",
+        institute_id=INSTITUTE_ID,
+        is_active=True
+    ))
+    db.commit()
+    return INSTITUTE_ID
+
+
+@pytest.fixture
+def admin_headers(client, institute):
+    """ADMIN bearer headers, already resolved so counts exclude the auth lookup"""
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+    client.get("/api/admin/calendar", headers=headers)
+    return headers
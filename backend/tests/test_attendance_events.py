@@ -0,0 +1,92 @@
+# tests/test_attendance_events.py
+import asyncio
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from conftest import INSTITUTE_ID, add_students
+
+# Import your models
+from models.attendance import Attendance
+from models.attendance_daily_summary import AttendanceDailySummary
+from schemas.attendance import AttendanceEvent
+import utils.attendance_events as attendance_events_module
+from utils.attendance_events import AttendanceEventIngestor, COMMITTED, FAILED
+import utils.school_calendar as school_calendar
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(attendance_events_module, "ATTENDANCE_EVENT_FLUSH_MS", 10)
+    monkeypatch.setattr(attendance_events_module, "ATTENDANCE_EVENT_RETRY_BACKOFF_MS", 10)
+
+
+def _events(student_ids, timestamp):
+    return [
+        AttendanceEvent(student_id=student_id, timestamp=timestamp, institute_id=INSTITUTE_ID, confidence=0.9)
+        for student_id in student_ids
+    ]
+
+
+def _ingest(ingestor, events):
+    async def run():
+        batch, _ = ingestor.submit(INSTITUTE_ID, events)
+        await ingestor.stop()
+        return batch
+    return asyncio.run(run())
+
+
+def _failing_writes(monkeypatch, failures):
+    """Make the first `failures` chunk writes raise; returns the attempt log"""
+    attempts = []
+    write = AttendanceEventIngestor._write
+
+    def flaky_write(items):
+        attempts.append(len(items))
+        if len(attempts) <= failures:
+            raise RuntimeError("database unavailable")
+        return write(items)
+
+    monkeypatch.setattr(AttendanceEventIngestor, "_write", staticmethod(flaky_write))
+    return attempts
+
+
+def test_failed_write_is_retried_until_it_commits(db, institute, monkeypatch):
+    student_ids = add_students(db, 5)
+    attempts = _failing_writes(monkeypatch, 2)
+
+    batch = _ingest(AttendanceEventIngestor(), _events(student_ids, datetime(2026, 3, 2, 9, 0)))
+
+    assert attempts == [5, 5, 5]
+    assert batch.status == COMMITTED
+    assert batch.error is None
+    assert batch.recorded == 5
+    assert db.query(Attendance).count() == 5
+
+
+def test_write_is_failed_after_the_last_retry(db, institute, monkeypatch):
+    student_ids = add_students(db, 3)
+    attempts = _failing_writes(monkeypatch, 100)
+    ingestor = AttendanceEventIngestor()
+
+    batch = _ingest(ingestor, _events(student_ids, datetime(2026, 3, 2, 9, 0)))
+
+    assert len(attempts) == attendance_events_module.ATTENDANCE_EVENT_MAX_RETRIES + 1
+    assert batch.status == FAILED
+    assert batch.error == "database unavailable"
+    assert batch.pending == 0
+    # The same recognitions can be sent again
+    assert ingestor._seen[date(2026, 3, 2)] == set()
+
+
+def test_events_are_recorded_on_the_institute_local_date(db, institute, monkeypatch):
+    monkeypatch.setattr(school_calendar, "INSTITUTE_TIMEZONE", ZoneInfo("Asia/Kolkata"))
+    student_ids = add_students(db, 2)
+    # 20:00 UTC on 2 March is 01:30 on 3 March in the institute's time zone
+    batch = _ingest(AttendanceEventIngestor(), _events(student_ids, datetime(2026, 3, 2, 20, 0, tzinfo=timezone.utc)))
+
+    assert batch.recorded == 2
+    assert {day for (day,) in db.query(Attendance.attendance_date)} == {date(2026, 3, 3)}
+    summary = db.query(AttendanceDailySummary).one()
+    assert (summary.attendance_date, summary.present_count) == (date(2026, 3, 3), 2)
@@ -0,0 +1,61 @@
+# tests/test_attendance_summary.py
+from datetime import date, timedelta
+
+from conftest import add_students, add_attendance
+
+# Import your models
+from models.student import Student
+from models.attendance_daily_summary import AttendanceDailySummary
+from utils.attendance_summary import adjust_daily_summary, record_student_class_changed, rebuild_attendance_summary
+
+DAYS = [date(2026, 3, 2) + timedelta(days=offset) for offset in range(30)]
+
+
+def _counts(db):
+    return {
+        (row.attendance_date, row.standard, row.stream): row.present_count
+        for row in db.query(AttendanceDailySummary).all()
+    }
+
+
+def test_adjust_daily_summary_upserts_and_never_goes_negative(db, institute, queries):
+    queries.reset()
+    adjust_daily_summary(db, institute, DAYS[0], "10th", None, 3)
+    adjust_daily_summary(db, institute, DAYS[0], "10th", None, 2)
+    assert queries.count == 2
+    assert len(queries.matching("ON CONFLICT")) == 2
+
+    adjust_daily_summary(db, institute, DAYS[0], "10th", None, -9)
+    adjust_daily_summary(db, institute, DAYS[1], "10th", None, -1)
+    db.commit()
+
+    assert _counts(db) == {(DAYS[0], "10th", ""): 0}
+
+
+def test_class_change_moves_attendance_in_one_statement_per_side(db, institute, queries):
+    student_ids = add_students(db, 3)
+    add_attendance(db, student_ids, DAYS)
+    rebuild_attendance_summary(db, institute)
+
+    student = db.get(Student, student_ids[0])
+    student.standard, student.stream = "11th", "Commerce"
+
+    queries.reset()
+    record_student_class_changed(db, student, "10th", "Science")
+    # Autoflushed student UPDATE, old-class decrement, new-class INSERT ... SELECT upsert
+    assert queries.count == 3
+    db.commit()
+
+    assert _counts(db) == {
+        **{(day, "10th", "Science"): 2 for day in DAYS},
+        **{(day, "11th", "Commerce"): 1 for day in DAYS}
+    }
+
+    # Moving back merges into the existing rows
+    student.standard, student.stream = "10th", "Science"
+    record_student_class_changed(db, student, "11th", "Commerce")
+    db.commit()
+
+    counts = _counts(db)
+    assert all(counts[(day, "10th", "Science")] == 3 for day in DAYS)
+    assert all(counts[(day, "11th", "Commerce")] == 0 for day in DAYS)
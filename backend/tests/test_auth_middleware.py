@@ -0,0 +1,73 @@
+# tests/test_auth_middleware.py
+from conftest import auth_headers, ADMIN_EMAIL, ADMIN_ID
+
+
+def test_first_request_looks_the_user_up_once(client, institute, queries):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+
+    response = client.get("/api/admin/calendar", headers=headers)
+    assert response.status_code == 200, response.text
+
+    # Middleware lookup only; get_current_user reuses the principal
+    assert len(queries.matching("FROM users")) == 1
+
+
+def test_cache_hit_skips_the_users_table(client, institute, queries):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+    client.get("/api/admin/calendar", headers=headers)
+
+    queries.reset()
+    response = client.get("/api/admin/calendar", headers=headers)
+    assert response.status_code == 200, response.text
+
+    # No token decode and no users round trip
+    assert queries.matching("FROM users") == []
+
+
+def test_cache_hit_loads_the_orm_user_by_primary_key(client, institute, queries):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+    client.get("/api/admin/calendar", headers=headers)
+
+    queries.reset()
+    response = client.get("/users/profile", headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert len(queries.matching("FROM users")) == 1
+
+
+def test_wrong_role_is_rejected_without_touching_the_handler(client, institute, queries):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+    client.get("/api/admin/calendar", headers=headers)
+
+    queries.reset()
+    response = client.get("/api/super-admin/dashboard-stats", headers=headers)
+
+    assert response.status_code == 403
+    assert queries.count == 0
+
+
+def test_cache_miss_shares_one_connection_with_the_handler(client, institute, checkouts):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+
+    checkouts.reset()
+    response = client.get("/api/admin/calendar", headers=headers)
+    assert response.status_code == 200, response.text
+
+    # The middleware's session is the one get_db hands to the handler
+    assert checkouts.count == 1
+
+
+def test_cache_hit_checks_out_only_the_handlers_connection(client, institute, checkouts):
+    headers = auth_headers(ADMIN_EMAIL, ADMIN_ID, "ADMIN")
+    client.get("/api/admin/calendar", headers=headers)
+
+    checkouts.reset()
+    response = client.get("/api/admin/calendar", headers=headers)
+    assert response.status_code == 200, response.text
+    assert checkouts.count == 1
+
+    # Rejected by role before any handler runs: no connection at all
+    checkouts.reset()
+    response = client.get("/api/super-admin/dashboard-stats", headers=headers)
+    assert response.status_code == 403
+    assert checkouts.count == 0
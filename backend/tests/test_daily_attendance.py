@@ -0,0 +1,49 @@
+# tests/test_daily_attendance.py
+from datetime import date
+
+from conftest import add_students, add_attendance
+
+DAY = date(2026, 3, 2)
+
+
+def _daily(client, headers, queries, **params):
+    queries.reset()
+    response = client.get(
+        "/api/admin/attendance/daily", headers=headers,
+        params={"date": str(DAY), **params}
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_daily_attendance_is_one_joined_query(client, db, admin_headers, queries):
+    add_attendance(db, add_students(db, 250), [DAY])
+
+    response = _daily(client, admin_headers, queries)
+    assert len(response.json()) == 250
+    assert queries.count == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_daily_attendance_pages_by_keyset(client, db, admin_headers, queries):
+    add_attendance(db, add_students(db, 250), [DAY])
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 100}
+        if cursor:
+            params["after_id"] = cursor
+        response = _daily(client, admin_headers, queries, **params)
+        assert queries.count == 1
+
+        seen.extend(record["id"] for record in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len(seen) == 250
+    assert seen == sorted(set(seen))
@@ -0,0 +1,81 @@
+# tests/test_faculty_students.py
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import add_students, add_attendance, auth_headers, INSTITUTE_ID
+from utils.attendance_bitsets import attendance_bitsets
+
+# Import your models
+from models.users import User
+from models.faculty import Faculty
+from models.faculty_student import FacultyStudent
+
+FACULTY_USER_ID = 2
+FACULTY_EMAIL = "faculty@inst001.test"
+
+
+@pytest.fixture
+def faculty_headers(client, db, institute):
+    db.add(User(
+        id=FACULTY_USER_ID,
+        email=FACULTY_EMAIL,
+        password_hash="unused",
+        role="FACULTY",
+        institute_id=INSTITUTE_ID,
+        is_active=True
+    ))
+    db.add(Faculty(
+        id=1,
+        user_id=FACULTY_USER_ID,
+        full_name="Faculty One",
+        email=FACULTY_EMAIL,
+        institute_id=INSTITUTE_ID,
+        stream="Science"
+    ))
+    db.commit()
+    return auth_headers(FACULTY_EMAIL, FACULTY_USER_ID, "FACULTY")
+
+
+def _assign(db, count, start_id=1):
+    student_ids = add_students(db, count, start_id=start_id)
+    db.add_all(FacultyStudent(faculty_id=1, student_id=student_id) for student_id in student_ids)
+    db.commit()
+    add_attendance(db, student_ids[::3], [date.today() - timedelta(days=offset) for offset in range(1, 20)])
+
+
+def _list_students(client, headers, queries):
+    queries.reset()
+    response = client.get("/api/faculty/students", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_cold_attendance_is_one_grouped_query_per_page(client, db, faculty_headers, queries):
+    _assign(db, 10)
+    client.get("/api/faculty/students", headers=faculty_headers)  # principal + calendar cached
+    attendance_bitsets.clear()
+
+    # Faculty, page of students, one attendance query for the whole page
+    _list_students(client, faculty_headers, queries)
+    assert queries.count == 3
+    assert len(queries.matching("FROM attendance")) == 1
+
+    _assign(db, 60, start_id=11)
+    attendance_bitsets.clear()
+    students = _list_students(client, faculty_headers, queries)
+    assert len(students) == 70
+    assert queries.count == 3
+
+
+def test_warm_page_reads_attendance_from_bitsets(client, db, faculty_headers, queries):
+    _assign(db, 30)
+    client.get("/api/faculty/students", headers=faculty_headers)
+
+    students = _list_students(client, faculty_headers, queries)
+    assert queries.count == 2
+    assert queries.matching("FROM attendance") == []
+
+    percentages = {student["student_id"]: student["attendance_percentage"] for student in students}
+    assert percentages[1] > 0
+    assert percentages[2] == 0
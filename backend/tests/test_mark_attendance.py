@@ -0,0 +1,85 @@
+# tests/test_mark_attendance.py
+from datetime import date
+
+from conftest import add_students, add_attendance
+
+# Import your models
+from models.attendance import Attendance
+from models.attendance_daily_summary import AttendanceDailySummary
+from models.institute_daily_usage import InstituteDailyUsage
+
+
+def _mark(client, headers, student_ids, attendance_date=None):
+    return client.post("/api/admin/attendance/mark", headers=headers, json={
+        "date": str(attendance_date or date.today()),
+        "attendance_records": [
+            {"student_id": student_id, "status": "present"} for student_id in student_ids
+        ]
+    })
+
+
+def test_mark_attendance_query_count_does_not_grow_with_batch(client, db, admin_headers, queries):
+    student_ids = add_students(db, 300)
+
+    # Validation IN query, one insert, summary upsert, usage upsert
+    queries.reset()
+    response = _mark(client, admin_headers, student_ids[:5])
+    assert response.status_code == 200, response.text
+    assert queries.count == 4
+
+    queries.reset()
+    response = _mark(client, admin_headers, student_ids[5:], date(2026, 1, 5))
+    assert response.status_code == 200, response.text
+    assert queries.count == 4
+    assert len(queries.matching("INSERT INTO attendance ")) == 1
+
+
+def test_mark_attendance_counts_only_new_records(client, db, admin_headers):
+    student_ids = add_students(db, 20)
+    today = date.today()
+    add_attendance(db, student_ids[:5], [today])
+
+    response = _mark(client, admin_headers, student_ids + [9999])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["success_count"] == 20
+    assert body["error_count"] == 1
+    assert body["errors"] == ["Student not found or not active: 9999"]
+
+    assert db.query(Attendance).filter(Attendance.attendance_date == today).count() == 20
+    summary = db.query(AttendanceDailySummary).filter(AttendanceDailySummary.attendance_date == today).one()
+    assert summary.present_count == 15
+    usage = db.query(InstituteDailyUsage).filter(InstituteDailyUsage.usage_date == today).one()
+    assert usage.attendance_events == 15
+
+
+def test_mark_attendance_rejects_unknown_statuses(client, db, admin_headers):
+    student_ids = add_students(db, 7)
+    today = date.today()
+    # Marking ABSENT never removes a record that already exists
+    add_attendance(db, student_ids[6:], [today])
+
+    response = client.post("/api/admin/attendance/mark", headers=admin_headers, json={
+        "date": str(today),
+        "attendance_records": [
+            {"student_id": student_ids[0], "status": "present"},
+            {"student_id": student_ids[1], "status": " late "},
+            {"student_id": student_ids[2], "status": "ABSENT"},
+            {"student_id": student_ids[3], "status": "absent"},
+            {"student_id": student_ids[4], "status": "holiday"},
+            {"student_id": student_ids[5]},
+            {"student_id": student_ids[6], "status": "ABSENT"}
+        ]
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["success_count"] == 5
+    assert body["error_count"] == 2
+    assert body["errors"][0].startswith("Invalid status 'holiday' for student 5")
+    assert body["errors"][1].startswith("Missing student_id or status")
+
+    # Lowercase and padded statuses are normalised; absent means no new record
+    recorded = {student_id for (student_id,) in db.query(Attendance.student_id)}
+    assert recorded == {student_ids[0], student_ids[1], student_ids[6]}
+    summary = db.query(AttendanceDailySummary).filter(AttendanceDailySummary.attendance_date == today).one()
+    assert summary.present_count == 2
@@ -0,0 +1,48 @@
+# tests/test_super_admin_dashboard.py
+import pytest
+
+from conftest import auth_headers
+
+# Import your models
+from models.users import User
+
+SUPER_ADMIN_ID = 900
+SUPER_ADMIN_EMAIL = "root@platform.test"
+
+
+@pytest.fixture
+def super_admin_headers(client, db, institute):
+    db.add(User(
+        id=SUPER_ADMIN_ID,
+        email=SUPER_ADMIN_EMAIL,
+        password_hash="unused",
+        role="SUPER_ADMIN",
+        is_active=True
+    ))
+    db.commit()
+    return auth_headers(SUPER_ADMIN_EMAIL, SUPER_ADMIN_ID, "SUPER_ADMIN")
+
+
+def _stats(client, headers):
+    response = client.get("/api/super-admin/dashboard-stats", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_dashboard_stats_are_cached_until_a_user_is_created(client, super_admin_headers, queries):
+    stats = _stats(client, super_admin_headers)
+    assert stats["total_users"] == 2
+
+    queries.reset()
+    assert _stats(client, super_admin_headers) == stats
+    assert queries.count == 0
+
+    response = client.post("/users/register", headers=super_admin_headers, json={
+        "email": "ops@example.com",
+        "password": "secret123",
+        "role": "SUPER_ADMIN"
+    })
+    assert response.status_code == 201, response.text
+
+    stats = _stats(client, super_admin_headers)
+    assert stats["total_users"] == 3
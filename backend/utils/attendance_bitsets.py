@@ -0,0 +1,242 @@
+# utils/attendance_bitsets.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+# Import your models
+from models.attendance import Attendance
+
+# (student, academic year) bitsets kept in memory, least recently used are dropped
+ATTENDANCE_BITSET_CACHE_SIZE = int(os.getenv("ATTENDANCE_BITSET_CACHE_SIZE", "20000"))
+# Seconds a bitset is reused before it is rebuilt. Writes made by other worker
+# processes are not seen until then: this is the staleness window
+ATTENDANCE_BITSET_TTL_SECONDS = int(os.getenv("ATTENDANCE_BITSET_TTL_SECONDS", "300"))
+
+# Academic years start on February 1st
+ACADEMIC_YEAR_START_MONTH = 2
+
+
+def academic_year_start(day: date) -> date:
+    """First day of the academic year containing day"""
+    if day.month < ACADEMIC_YEAR_START_MONTH:
+        return date(day.year - 1, ACADEMIC_YEAR_START_MONTH, 1)
+    return date(day.year, ACADEMIC_YEAR_START_MONTH, 1)
+
+
+def _next_year_start(year_start: date) -> date:
+    return date(year_start.year + 1, ACADEMIC_YEAR_START_MONTH, 1)
+
+
+def _year_slices(start_date: date, end_date: date) -> List[Tuple[date, int, int]]:
+    """Split [start_date, end_date] into (academic year start, first bit, last bit) pieces"""
+    slices = []
+    year_start = academic_year_start(start_date)
+    while year_start <= end_date:
+        next_start = _next_year_start(year_start)
+        first = max(start_date, year_start)
+        last = min(end_date, next_start - timedelta(days=1))
+        slices.append((year_start, (first - year_start).days, (last - year_start).days))
+        year_start = next_start
+    return slices
+
+
+def _count_bits(bits: int, first: int, last: int) -> int:
+    """Set bits between positions first and last (inclusive)"""
+    return ((bits >> first) & ((1 << (last - first + 1)) - 1)).bit_count()
+
+
+def _bit_dates(bits: int, year_start: date, first: int, last: int) -> List[date]:
+    """Days of the set bits between positions first and last, oldest first"""
+    dates = []
+    bits = (bits >> first) & ((1 << (last - first + 1)) - 1)
+    while bits:
+        low_bit = bits & -bits
+        dates.append(year_start + timedelta(days=first + low_bit.bit_length() - 1))
+        bits ^= low_bit
+    return dates
+
+
+class StudentAttendanceBits:
+    """
+    Bitsets of one student, fetched together for a date range, answering
+    any number of counts / date lists / presence checks without going
+    back to the cache. Days outside the fetched years load that year on
+    demand.
+    """
+
+    def __init__(self, cache: "AttendanceBitsetCache", db: Session, student_id: int, years: Dict[date, int]):
+        self._cache = cache
+        self._db = db
+        self.student_id = student_id
+        self._years = years
+
+    def _bits(self, year_start: date) -> int:
+        if year_start not in self._years:
+            self._years[year_start] = self._cache._bitsets(
+                self._db, [self.student_id], [year_start]
+            )[(self.student_id, year_start)]
+        return self._years[year_start]
+
+    def count(self, start_date: date, end_date: date) -> int:
+        """Days present in [start_date, end_date]"""
+        if end_date < start_date:
+            return 0
+        return sum(
+            _count_bits(self._bits(year_start), first, last)
+            for year_start, first, last in _year_slices(start_date, end_date)
+        )
+
+    def present_dates(self, start_date: date, end_date: date) -> List[date]:
+        """Present dates in [start_date, end_date], oldest first"""
+        if end_date < start_date:
+            return []
+        dates = []
+        for year_start, first, last in _year_slices(start_date, end_date):
+            dates.extend(_bit_dates(self._bits(year_start), year_start, first, last))
+        return dates
+
+    def is_present(self, day: date) -> bool:
+        year_start = academic_year_start(day)
+        return bool(self._bits(year_start) >> (day - year_start).days & 1)
+
+
+class AttendanceBitsetCache:
+    """
+    Presence of each student as one bit per calendar day, one integer per
+    (student, academic year).
+
+    Bitsets are built lazily from attendance (one query for every missing
+    student/year of a call), kept for ATTENDANCE_BITSET_TTL_SECONDS in a
+    bounded LRU and updated in place by the attendance write paths of this
+    process. A range count is a shift, a mask and a popcount per year.
+
+    The cache is per process: attendance written or deleted through another
+    worker is only seen once the bitset expires, so readers can lag other
+    workers' writes by up to ATTENDANCE_BITSET_TTL_SECONDS.
+    """
+
+    def __init__(self, max_entries: int = ATTENDANCE_BITSET_CACHE_SIZE,
+                 ttl: int = ATTENDANCE_BITSET_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[int, date], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every write; a build that overlapped a write is not cached
+        self._generation = 0
+
+    def _bitsets(self, db: Session, student_ids: List[int], year_starts: List[date]) -> Dict[Tuple[int, date], int]:
+        """Bitsets for every (student, year), building the missing ones with one query"""
+        result = {}
+        missing = set()
+        now = time.time()
+
+        with self._lock:
+            for student_id in student_ids:
+                for year_start in year_starts:
+                    key = (student_id, year_start)
+                    cached = self._entries.get(key)
+                    if cached and cached[1] > now:
+                        self._entries.move_to_end(key)
+                        result[key] = cached[0]
+                    else:
+                        missing.add(key)
+            generation = self._generation
+
+        if not missing:
+            return result
+
+        missing_students = sorted({student_id for student_id, _ in missing})
+        missing_years = sorted({year_start for _, year_start in missing})
+
+        built = dict.fromkeys(missing, 0)
+        rows = db.query(Attendance.student_id, Attendance.attendance_date).filter(
+            Attendance.student_id.in_(missing_students),
+            Attendance.attendance_date >= missing_years[0],
+            Attendance.attendance_date < _next_year_start(missing_years[-1])
+        )
+        for student_id, attendance_date in rows:
+            key = (student_id, academic_year_start(attendance_date))
+            if key in built:
+                built[key] |= 1 << (attendance_date - key[1]).days
+
+        result.update(built)
+
+        with self._lock:
+            if generation == self._generation:
+                expires_at = time.time() + self.ttl
+                for key, bits in built.items():
+                    self._entries[key] = (bits, expires_at)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return result
+
+    def count_many(self, db: Session, student_ids: Iterable[int], start_date: date, end_date: date) -> Dict[int, int]:
+        """Days present in [start_date, end_date] for each student"""
+        student_ids = list(student_ids)
+        counts = dict.fromkeys(student_ids, 0)
+        if not student_ids or end_date < start_date:
+            return counts
+
+        slices = _year_slices(start_date, end_date)
+        bitsets = self._bitsets(db, student_ids, [year_start for year_start, _, _ in slices])
+
+        for student_id in student_ids:
+            for year_start, first, last in slices:
+                counts[student_id] += _count_bits(bitsets[(student_id, year_start)], first, last)
+
+        return counts
+
+    def student(self, db: Session, student_id: int, start_date: date, end_date: Optional[date] = None) -> StudentAttendanceBits:
+        """All bitsets of a student covering [start_date, end_date], fetched at once"""
+        end_date = end_date or start_date
+        year_starts = [year_start for year_start, _, _ in _year_slices(start_date, max(start_date, end_date))]
+        bitsets = self._bitsets(db, [student_id], year_starts)
+        return StudentAttendanceBits(
+            self, db, student_id,
+            {year_start: bitsets[(student_id, year_start)] for year_start in year_starts}
+        )
+
+    def count(self, db: Session, student_id: int, start_date: date, end_date: date) -> int:
+        """Days present in [start_date, end_date]"""
+        return self.count_many(db, [student_id], start_date, end_date)[student_id]
+
+    def present_dates(self, db: Session, student_id: int, start_date: date, end_date: date) -> List[date]:
+        """Present dates in [start_date, end_date], oldest first"""
+        if end_date < start_date:
+            return []
+        return self.student(db, student_id, start_date, end_date).present_dates(start_date, end_date)
+
+    def is_present(self, db: Session, student_id: int, day: date) -> bool:
+        return self.student(db, student_id, day).is_present(day)
+
+    def mark_present(self, student_id: int, day: date) -> None:
+        """Set a day after its attendance row is committed"""
+        year_start = academic_year_start(day)
+        key = (student_id, year_start)
+        with self._lock:
+            self._generation += 1
+            cached = self._entries.get(key)
+            if cached:
+                self._entries[key] = (cached[0] | 1 << (day - year_start).days, cached[1])
+
+    def invalidate_student(self, student_id: int) -> None:
+        """Forget a student's bitsets (attendance deleted)"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == student_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+attendance_bitsets = AttendanceBitsetCache()
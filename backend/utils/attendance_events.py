@@ -0,0 +1,371 @@
+# utils/attendance_events.py
+import asyncio
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import SessionLocal
+
+# Import your models
+from models.student import Student
+from utils.attendance_writes import insert_attendance_ignore_existing
+from utils.attendance_summary import adjust_daily_summary
+from utils.attendance_bitsets import attendance_bitsets
+from utils.usage_rollup import record_usage
+from utils.school_calendar import local_date, local_today
+
+# Flush queued events after this many milliseconds...
+ATTENDANCE_EVENT_FLUSH_MS = int(os.getenv("ATTENDANCE_EVENT_FLUSH_MS", "200"))
+# ...or as soon as this many are queued
+ATTENDANCE_EVENT_FLUSH_SIZE = int(os.getenv("ATTENDANCE_EVENT_FLUSH_SIZE", "500"))
+# Events waiting to be written; batches that do not fit are refused with 503
+ATTENDANCE_EVENT_QUEUE_SIZE = int(os.getenv("ATTENDANCE_EVENT_QUEUE_SIZE", "50000"))
+# Recognitions below this confidence are not recorded
+ATTENDANCE_EVENT_MIN_CONFIDENCE = float(os.getenv("ATTENDANCE_EVENT_MIN_CONFIDENCE", "0.5"))
+# Seconds an idempotency token (and its batch status) is remembered
+ATTENDANCE_EVENT_TOKEN_TTL_SECONDS = int(os.getenv("ATTENDANCE_EVENT_TOKEN_TTL_SECONDS", "86400"))
+# Seconds shutdown waits for queued events to be written
+ATTENDANCE_EVENT_DRAIN_SECONDS = int(os.getenv("ATTENDANCE_EVENT_DRAIN_SECONDS", "30"))
+# Times a chunk that failed to write is queued again before its events are marked failed...
+ATTENDANCE_EVENT_MAX_RETRIES = int(os.getenv("ATTENDANCE_EVENT_MAX_RETRIES", "3"))
+# ...after this many milliseconds, doubled on every further retry
+ATTENDANCE_EVENT_RETRY_BACKOFF_MS = int(os.getenv("ATTENDANCE_EVENT_RETRY_BACKOFF_MS", "500"))
+
+QUEUED = "queued"
+COMMITTED = "committed"
+FAILED = "failed"
+
+
+class EventBatch:
+    """Acknowledgement and write outcome of one submitted batch"""
+
+    def __init__(self, token: str, institute_id: str):
+        self.token = token
+        self.institute_id = institute_id
+        self.status = QUEUED
+        self.received = 0
+        self.queued = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.recorded = 0
+        self.already_recorded = 0
+        self.unknown_students = 0
+        self.error: Optional[str] = None
+        self.pending = 0
+        self.received_at = datetime.utcnow()
+        self.flushed_at: Optional[datetime] = None
+        self.expires_at = time.time() + ATTENDANCE_EVENT_TOKEN_TTL_SECONDS
+
+    def to_dict(self) -> dict:
+        return {
+            "token": self.token,
+            "status": self.status,
+            "received": self.received,
+            "queued": self.queued,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "recorded": self.recorded,
+            "already_recorded": self.already_recorded,
+            "unknown_students": self.unknown_students,
+            "error": self.error,
+            "received_at": self.received_at.isoformat(),
+            "flushed_at": self.flushed_at.isoformat() if self.flushed_at else None
+        }
+
+
+class AttendanceEventIngestor:
+    """
+    Write-behind ingestion of face-recognition events.
+
+    submit() filters a batch (institute, confidence, one event per student
+    per day) and puts the rest on an asyncio queue, returning before any
+    database work. A single flusher task drains the queue every
+    ATTENDANCE_EVENT_FLUSH_MS or ATTENDANCE_EVENT_FLUSH_SIZE events and
+    writes each chunk in a thread with one IN query, one
+    INSERT ... ON CONFLICT DO NOTHING and one commit. A chunk that fails
+    is queued again with backoff, up to ATTENDANCE_EVENT_MAX_RETRIES times.
+
+    Events are bucketed by their date in INSTITUTE_TIMEZONE, the same
+    local date mark_attendance records.
+
+    The queue, the per-day dedupe and the idempotency tokens live in
+    process memory; duplicates that reach the database from other workers
+    are absorbed by the (student_id, attendance_date) unique constraint.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._batches: Dict[Tuple[str, str], EventBatch] = {}
+        self._seen: Dict[date, Set[int]] = {}
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=ATTENDANCE_EVENT_QUEUE_SIZE)
+
+        if self._flusher is None or self._flusher.done():
+            if self._flusher is not None and not self._flusher.cancelled() and self._flusher.exception():
+                print(f"Attendance event flusher stopped, restarting: {str(self._flusher.exception())}")
+            # Restart on the same queue: events already acknowledged are still written
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def _purge(self) -> None:
+        now = time.time()
+        for key in [key for key, batch in self._batches.items() if batch.expires_at <= now]:
+            del self._batches[key]
+
+        # Only today and yesterday are deduped in memory
+        oldest = local_today() - timedelta(days=1)
+        for day in [day for day in self._seen if day < oldest]:
+            del self._seen[day]
+
+    def submit(self, institute_id: str, events: list, token: Optional[str] = None) -> Tuple[EventBatch, bool]:
+        """
+        Queue a batch of events for institute_id.
+
+        Returns:
+            (batch, replayed) - replayed is True when token was already used
+            (and did not fail) so nothing new was queued
+
+        Raises:
+            asyncio.QueueFull when the batch does not fit in the queue
+        """
+        self._ensure_started()
+        self._purge()
+
+        if token:
+            existing = self._batches.get((institute_id, token))
+            if existing and existing.status != FAILED:
+                return existing, True
+        else:
+            token = uuid.uuid4().hex
+
+        accepted = []
+        batch = EventBatch(token, institute_id)
+        batch.received = len(events)
+
+        for event in events:
+            if event.institute_id != institute_id or event.confidence < ATTENDANCE_EVENT_MIN_CONFIDENCE:
+                batch.rejected += 1
+                continue
+
+            attendance_date = local_date(event.timestamp)
+            seen = self._seen.setdefault(attendance_date, set())
+            if event.student_id in seen:
+                batch.duplicates += 1
+                continue
+
+            seen.add(event.student_id)
+            accepted.append(event)
+
+        if self._queue.qsize() + len(accepted) > ATTENDANCE_EVENT_QUEUE_SIZE:
+            for event in accepted:
+                self._seen[local_date(event.timestamp)].discard(event.student_id)
+            raise asyncio.QueueFull()
+
+        batch.queued = batch.pending = len(accepted)
+        if not accepted:
+            batch.status = COMMITTED
+            batch.flushed_at = datetime.utcnow()
+
+        self._batches[(institute_id, token)] = batch
+        for event in accepted:
+            self._queue.put_nowait((batch, event, 0))
+
+        return batch, False
+
+    def get(self, institute_id: str, token: str) -> Optional[EventBatch]:
+        """Batch by idempotency token, only visible to its own institute"""
+        self._purge()
+        return self._batches.get((institute_id, token))
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            deadline = loop.time() + ATTENDANCE_EVENT_FLUSH_MS / 1000
+
+            while len(items) < ATTENDANCE_EVENT_FLUSH_SIZE:
+                # Take what is already queued without waiting
+                try:
+                    items.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(items)
+
+    async def _flush(self, items: List[tuple]) -> None:
+        try:
+            outcome = await asyncio.get_running_loop().run_in_executor(None, self._write, items)
+        except Exception as e:
+            print(f"Error writing attendance events: {str(e)}")
+            retries: Dict[int, List[tuple]] = {}
+            exhausted = []
+            for item in items:
+                if item[2] < ATTENDANCE_EVENT_MAX_RETRIES:
+                    retries.setdefault(item[2], []).append(item)
+                else:
+                    exhausted.append(item)
+
+            loop = asyncio.get_running_loop()
+            for attempt, retry_items in retries.items():
+                # Left unfinished in the queue until requeued, so stop() keeps waiting
+                loop.call_later(
+                    ATTENDANCE_EVENT_RETRY_BACKOFF_MS * 2 ** attempt / 1000,
+                    self._requeue, retry_items, str(e)
+                )
+            if exhausted:
+                self._fail(exhausted, str(e))
+            return
+
+        try:
+            for (batch, event, _), result in zip(items, outcome):
+                if result == "recorded":
+                    batch.recorded += 1
+                elif result == "already_recorded":
+                    batch.already_recorded += 1
+                elif result == "unknown_student":
+                    batch.unknown_students += 1
+
+                batch.pending -= 1
+                if batch.pending == 0:
+                    batch.status = FAILED if batch.error else COMMITTED
+                    batch.flushed_at = datetime.utcnow()
+        finally:
+            # Always release the items so stop() can drain
+            for _ in items:
+                self._queue.task_done()
+
+    def _requeue(self, items: List[tuple], error: str) -> None:
+        """Put a failed chunk back on the queue for its next attempt"""
+        if self._queue.qsize() + len(items) > ATTENDANCE_EVENT_QUEUE_SIZE:
+            self._fail(items, f"{error} (queue full, not retried)")
+            return
+
+        for batch, event, attempt in items:
+            self._queue.put_nowait((batch, event, attempt + 1))
+            self._queue.task_done()
+
+    def _fail(self, items: List[tuple], error: str) -> None:
+        """Give up on a chunk: its batches end FAILED"""
+        try:
+            for batch, event, _ in items:
+                # Let a retry of the same recognition through
+                self._seen.get(local_date(event.timestamp), set()).discard(event.student_id)
+                batch.error = error
+
+                batch.pending -= 1
+                if batch.pending == 0:
+                    batch.status = FAILED
+                    batch.flushed_at = datetime.utcnow()
+        finally:
+            for _ in items:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(items: List[tuple]) -> List[str]:
+        """Write one chunk of events (runs in a worker thread); result per event"""
+        db = SessionLocal()
+        try:
+            # 1. Students of the events, checked against their institute in one query
+            students = {
+                student.student_id: student
+                for student in db.query(
+                    Student.student_id,
+                    Student.institute_id,
+                    Student.standard,
+                    Student.stream
+                ).filter(
+                    Student.student_id.in_({event.student_id for _, event, _ in items}),
+                    Student.is_active == True
+                )
+            }
+
+            rows = []
+            for _, event, _ in items:
+                student = students.get(event.student_id)
+                if student and student.institute_id == event.institute_id:
+                    rows.append({
+                        "student_id": event.student_id,
+                        "attendance_date": local_date(event.timestamp),
+                        "institute_id": event.institute_id,
+                        "created_at": event.timestamp
+                    })
+
+            # 2. One INSERT ... ON CONFLICT DO NOTHING for the whole chunk
+            inserted = set(insert_attendance_ignore_existing(db, rows))
+
+            # 3. Daily summary, one update per institute/date/class/stream
+            class_counts = Counter(
+                (students[student_id].institute_id, attendance_date,
+                 students[student_id].standard, students[student_id].stream)
+                for student_id, attendance_date in inserted
+            )
+            for (institute_id, attendance_date, standard, stream), count in class_counts.items():
+                adjust_daily_summary(db, institute_id, attendance_date, standard, stream, count)
+            
+            # 4. Usage rollup, one upsert per institute/date
+            usage_counts = Counter(
+                (students[student_id].institute_id, attendance_date)
+                for student_id, attendance_date in inserted
+            )
+            for (institute_id, attendance_date), count in usage_counts.items():
+                record_usage(db, institute_id, attendance_date, attendance_events=count)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for student_id, attendance_date in inserted:
+            attendance_bitsets.mark_present(student_id, attendance_date)
+
+        results = []
+        for _, event, _ in items:
+            student = students.get(event.student_id)
+            key = (event.student_id, local_date(event.timestamp))
+            if not student or student.institute_id != event.institute_id:
+                results.append("unknown_student")
+            elif key in inserted:
+                inserted.discard(key)
+                results.append("recorded")
+            else:
+                results.append("already_recorded")
+        return results
+
+    async def stop(self) -> None:
+        """Write everything still queued and stop the flusher (application shutdown)"""
+        if self._flusher is None:
+            return
+
+        # A dead flusher would never call task_done(); restart it to drain
+        self._ensure_started()
+
+        try:
+            await asyncio.wait_for(self._queue.join(), ATTENDANCE_EVENT_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"Attendance events not written at shutdown: {self._queue.qsize()} still queued")
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+
+
+attendance_events = AttendanceEventIngestor()
@@ -0,0 +1,176 @@
+# utils/attendance_stats.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional, List, Dict, Any
+from datetime import date, timedelta
+
+# Import your models
+from models.student import Student
+from models.attendance import Attendance
+from models.faculty_student import FacultyStudent
+from models.attendance_daily_summary import AttendanceDailySummary
+
+
+def get_student_attendance_summary(
+    db: Session,
+    institute_id: str,
+    start_date: date,
+    end_date: date,
+    class_filter: Optional[str] = None,
+    stream_filter: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """
+    Get present days and last attendance date for every active student
+    of an institute in a single query.
+
+    Attendance is aggregated once with GROUP BY (count + max) and
+    left-joined to the filtered student set, so students without any
+    attendance in the range still appear with present_days = 0.
+
+    Returns:
+        List of rows with student_id, roll_no, full_name, standard, stream,
+        email, phone, present_days and last_attendance
+    """
+    attendance_summary = db.query(
+        Attendance.student_id.label("student_id"),
+        func.count(Attendance.id).label("present_days"),
+        func.max(Attendance.attendance_date).label("last_attendance")
+    ).filter(
+        Attendance.institute_id == institute_id,
+        Attendance.attendance_date >= start_date,
+        Attendance.attendance_date <= end_date
+    ).group_by(
+        Attendance.student_id
+    ).subquery()
+
+    query = db.query(
+        Student.student_id,
+        Student.roll_no,
+        Student.full_name,
+        Student.standard,
+        Student.stream,
+        Student.email,
+        Student.phone,
+        func.coalesce(attendance_summary.c.present_days, 0).label("present_days"),
+        attendance_summary.c.last_attendance
+    ).outerjoin(
+        attendance_summary, Student.student_id == attendance_summary.c.student_id
+    ).filter(
+        Student.institute_id == institute_id,
+        Student.is_active == True,
+        Student.status == 'ACTIVE'
+    )
+
+    # Apply filters
+    if class_filter:
+        query = query.filter(Student.standard == class_filter)
+
+    if stream_filter:
+        query = query.filter(Student.stream == stream_filter)
+
+    query = query.order_by(Student.roll_no)
+
+    if limit:
+        query = query.limit(limit)
+
+    return query.all()
+
+
+def get_daily_attendance_counts(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    institute_id: Optional[str] = None,
+    faculty_id: Optional[int] = None
+) -> Dict[date, int]:
+    """
+    Count present students per day in [start_date, end_date] from the
+    attendance_daily_summary table (O(days x classes) rows, not raw
+    attendance).
+
+    When faculty_id is given, only students actively assigned to that
+    faculty are counted. The summary is keyed by class/stream, not by
+    assignment, so this reads raw attendance joined through
+    faculty_students - the same student set a faculty's total counts.
+
+    Returns:
+        Dict mapping attendance_date to present count (days without
+        attendance are absent from the dict)
+    """
+    if faculty_id is not None:
+        query = db.query(
+            Attendance.attendance_date,
+            func.count(Attendance.id)
+        ).join(
+            FacultyStudent, Attendance.student_id == FacultyStudent.student_id
+        ).filter(
+            FacultyStudent.faculty_id == faculty_id,
+            FacultyStudent.is_active == True,
+            Attendance.attendance_date >= start_date,
+            Attendance.attendance_date <= end_date
+        )
+
+        if institute_id:
+            query = query.filter(Attendance.institute_id == institute_id)
+
+        rows = query.group_by(Attendance.attendance_date).all()
+
+        return {attendance_date: count for attendance_date, count in rows}
+
+    query = db.query(
+        AttendanceDailySummary.attendance_date,
+        func.sum(AttendanceDailySummary.present_count)
+    ).filter(
+        AttendanceDailySummary.attendance_date >= start_date,
+        AttendanceDailySummary.attendance_date <= end_date
+    )
+
+    if institute_id:
+        query = query.filter(AttendanceDailySummary.institute_id == institute_id)
+
+    rows = query.group_by(AttendanceDailySummary.attendance_date).all()
+
+    return {attendance_date: int(count or 0) for attendance_date, count in rows}
+
+
+def build_attendance_trend(
+    db: Session,
+    total_students: int,
+    days: int = 7,
+    end_date: Optional[date] = None,
+    institute_id: Optional[str] = None,
+    faculty_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build an N-day attendance trend ending on end_date (default today).
+
+    All days are fetched with a single grouped query and missing days are
+    zero-filled here, oldest day first.
+    """
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+
+    daily_counts = get_daily_attendance_counts(
+        db,
+        start_date,
+        end_date,
+        institute_id=institute_id,
+        faculty_id=faculty_id
+    )
+
+    trend = []
+    for i in range(days - 1, -1, -1):  # Oldest day to end_date
+        day = end_date - timedelta(days=i)
+        present = daily_counts.get(day, 0)
+        rate = (present / total_students) * 100 if total_students > 0 else 0
+
+        trend.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "day_name": day.strftime("%A")[:3],
+            "attendance_rate": round(rate, 1),
+            "total": total_students,
+            "present": present
+        })
+
+    return trend
@@ -0,0 +1,251 @@
+# utils/attendance_summary.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, literal, case
+from typing import Optional
+from datetime import date
+
+# Import your models
+from models.student import Student
+from models.attendance import Attendance
+from models.attendance_daily_summary import AttendanceDailySummary
+from utils.usage_rollup import _dialect_insert
+
+
+_SUMMARY_KEY_COLUMNS = [
+    AttendanceDailySummary.institute_id,
+    AttendanceDailySummary.attendance_date,
+    AttendanceDailySummary.standard,
+    AttendanceDailySummary.stream
+]
+
+
+def _summary_key(standard: Optional[str], stream: Optional[str]):
+    """Normalise class/stream to the NOT NULL values used in the summary key"""
+    return standard or "", stream or ""
+
+
+def adjust_daily_summary(
+    db: Session,
+    institute_id: str,
+    attendance_date: date,
+    standard: Optional[str],
+    stream: Optional[str],
+    delta: int
+) -> None:
+    """
+    Add delta (positive on insert, negative on delete) to the present count
+    of one (institute, date, class, stream) summary row.
+
+    Must be called in the same transaction as the attendance write; the
+    caller commits.
+    """
+    if delta == 0:
+        return
+
+    standard, stream = _summary_key(standard, stream)
+    key = (
+        AttendanceDailySummary.institute_id == institute_id,
+        AttendanceDailySummary.attendance_date == attendance_date,
+        AttendanceDailySummary.standard == standard,
+        AttendanceDailySummary.stream == stream
+    )
+
+    if delta < 0:
+        # Only an existing row can be decremented; never below zero
+        present_count = AttendanceDailySummary.present_count + delta
+        db.query(AttendanceDailySummary).filter(*key).update(
+            {AttendanceDailySummary.present_count: case((present_count < 0, 0), else_=present_count)},
+            synchronize_session=False
+        )
+        return
+
+    insert = _dialect_insert(db)
+    if insert is not None:
+        statement = insert(AttendanceDailySummary).values(
+            institute_id=institute_id,
+            attendance_date=attendance_date,
+            standard=standard,
+            stream=stream,
+            present_count=delta
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=_SUMMARY_KEY_COLUMNS,
+            set_={
+                "present_count": AttendanceDailySummary.present_count + statement.excluded.present_count,
+                "updated_at": func.now()
+            }
+        )
+        db.execute(statement)
+        return
+
+    # Portable fallback: locked read, then update or insert
+    summary = db.query(AttendanceDailySummary).filter(*key).with_for_update().first()
+
+    if summary:
+        summary.present_count = summary.present_count + delta
+    else:
+        db.add(AttendanceDailySummary(
+            institute_id=institute_id,
+            attendance_date=attendance_date,
+            standard=standard,
+            stream=stream,
+            present_count=delta
+        ))
+    db.flush()
+
+
+def record_attendance_added(db: Session, student: Student, attendance_date: date, count: int = 1) -> None:
+    """Count new attendance record(s) for a student in the daily summary"""
+    adjust_daily_summary(
+        db, student.institute_id, attendance_date, student.standard, student.stream, count
+    )
+
+
+def _remove_student_dates(db: Session, student_id: int, institute_id: str, standard: Optional[str], stream: Optional[str]) -> None:
+    """Decrement the given class/stream summary once for every date the student was present"""
+    standard, stream = _summary_key(standard, stream)
+
+    student_dates = select(Attendance.attendance_date).where(
+        Attendance.student_id == student_id
+    )
+
+    db.query(AttendanceDailySummary).filter(
+        AttendanceDailySummary.institute_id == institute_id,
+        AttendanceDailySummary.standard == standard,
+        AttendanceDailySummary.stream == stream,
+        AttendanceDailySummary.attendance_date.in_(student_dates)
+    ).update(
+        {AttendanceDailySummary.present_count: AttendanceDailySummary.present_count - 1},
+        synchronize_session=False
+    )
+
+
+def record_student_attendance_removed(db: Session, student: Student) -> None:
+    """
+    Remove all attendance of a student from the daily summary.
+    Call before deleting the student's attendance rows.
+    """
+    _remove_student_dates(
+        db, student.student_id, student.institute_id, student.standard, student.stream
+    )
+
+
+def record_student_class_changed(
+    db: Session,
+    student: Student,
+    old_standard: Optional[str],
+    old_stream: Optional[str]
+) -> None:
+    """
+    Move a student's attendance to the new class/stream summary rows.
+    Call after updating student.standard / student.stream, before commit.
+    """
+    if _summary_key(old_standard, old_stream) == _summary_key(student.standard, student.stream):
+        return
+
+    _remove_student_dates(
+        db, student.student_id, student.institute_id, old_standard, old_stream
+    )
+
+    insert = _dialect_insert(db)
+    if insert is None:
+        attendance_dates = db.query(Attendance.attendance_date).filter(
+            Attendance.student_id == student.student_id
+        ).all()
+
+        for (attendance_date,) in attendance_dates:
+            record_attendance_added(db, student, attendance_date)
+        return
+
+    # One INSERT ... SELECT adding the student's days to the new class/stream rows
+    standard, stream = _summary_key(student.standard, student.stream)
+    student_dates = select(
+        literal(student.institute_id),
+        Attendance.attendance_date,
+        literal(standard),
+        literal(stream),
+        func.count()
+    ).where(
+        Attendance.student_id == student.student_id
+    ).group_by(
+        Attendance.attendance_date
+    )
+
+    statement = insert(AttendanceDailySummary).from_select(
+        [column.key for column in _SUMMARY_KEY_COLUMNS] + ["present_count"],
+        student_dates
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=_SUMMARY_KEY_COLUMNS,
+        set_={
+            "present_count": AttendanceDailySummary.present_count + statement.excluded.present_count,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(statement)
+
+
+def rebuild_attendance_summary(db: Session, institute_id: Optional[str] = None) -> int:
+    """
+    Recompute the daily summary from raw attendance (backfill / repair).
+
+    Returns:
+        Number of summary rows written
+    """
+    delete_query = db.query(AttendanceDailySummary)
+    if institute_id:
+        delete_query = delete_query.filter(AttendanceDailySummary.institute_id == institute_id)
+    delete_query.delete(synchronize_session=False)
+
+    standard = func.coalesce(Student.standard, "")
+    stream = func.coalesce(Student.stream, "")
+
+    query = db.query(
+        Attendance.institute_id,
+        Attendance.attendance_date,
+        standard,
+        stream,
+        func.count(Attendance.id)
+    ).join(
+        Student, Attendance.student_id == Student.student_id
+    )
+
+    if institute_id:
+        query = query.filter(Attendance.institute_id == institute_id)
+
+    rows = query.group_by(
+        Attendance.institute_id,
+        Attendance.attendance_date,
+        standard,
+        stream
+    ).all()
+
+    db.bulk_save_objects([
+        AttendanceDailySummary(
+            institute_id=row_institute_id,
+            attendance_date=attendance_date,
+            standard=row_standard,
+            stream=row_stream,
+            present_count=present_count
+        )
+        for row_institute_id, attendance_date, row_standard, row_stream, present_count in rows
+    ])
+    db.commit()
+
+    return len(rows)
+
+
+if __name__ == "__main__":
+    # Backfill: python -m utils.attendance_summary [institute_id]
+    import sys
+    from database import SessionLocal, engine, Base
+
+    Base.metadata.create_all(bind=engine, tables=[AttendanceDailySummary.__table__])
+
+    db = SessionLocal()
+    try:
+        target_institute = sys.argv[1] if len(sys.argv) > 1 else None
+        written = rebuild_attendance_summary(db, target_institute)
+        print(f"Rebuilt attendance_daily_summary: {written} rows")
+    finally:
+        db.close()
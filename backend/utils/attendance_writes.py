@@ -0,0 +1,60 @@
+# utils/attendance_writes.py
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, tuple_
+from typing import Dict, Iterable, List, Tuple, Any
+from datetime import date
+
+# Import your models
+from models.attendance import Attendance
+
+
+def insert_attendance_ignore_existing(db: Session, rows: Iterable[Dict[str, Any]]) -> List[Tuple[int, date]]:
+    """
+    Insert attendance rows (student_id, attendance_date, institute_id,
+    created_at) as one set-based statement, skipping rows whose
+    (student_id, attendance_date) already exists:
+    INSERT ... ON CONFLICT (student_id, attendance_date) DO NOTHING on
+    PostgreSQL and SQLite, existence check + insert elsewhere.
+
+    Runs in the caller's transaction; the caller commits.
+
+    Returns:
+        (student_id, attendance_date) of the rows actually inserted
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(Attendance).on_conflict_do_nothing(
+            index_elements=[Attendance.student_id, Attendance.attendance_date]
+        ).returning(Attendance.student_id, Attendance.attendance_date)
+
+        return [tuple(row) for row in db.execute(statement, rows)]
+
+    # Portable fallback: skip keys that already exist, insert the rest
+    keys = {(row["student_id"], row["attendance_date"]) for row in rows}
+    existing = set(
+        db.query(Attendance.student_id, Attendance.attendance_date).filter(
+            tuple_(Attendance.student_id, Attendance.attendance_date).in_(keys)
+        ).all()
+    )
+
+    new_rows = []
+    for row in rows:
+        key = (row["student_id"], row["attendance_date"])
+        if key not in existing:
+            existing.add(key)
+            new_rows.append(row)
+
+    if new_rows:
+        db.execute(insert(Attendance), new_rows)
+
+    return [(row["student_id"], row["attendance_date"]) for row in new_rows]
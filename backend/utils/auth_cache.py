@@ -0,0 +1,124 @@
+# utils/auth_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+# Seconds a resolved principal is trusted before users is queried again
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+# Maximum number of cached tokens (least recently used are evicted first)
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "5000"))
+
+
+class AuthPrincipal:
+    """
+    Slim, detached view of an authenticated user.
+    Carries only what the role dependencies and most endpoints read; use
+    routers.auth.get_current_db_user when the ORM User row is needed.
+    """
+    __slots__ = ("id", "email", "role", "institute_id", "is_active", "expires_at")
+
+    def __init__(self, id: int, email: str, role: str, institute_id: Optional[str],
+                 is_active: bool, expires_at: float):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.institute_id = institute_id
+        self.is_active = is_active
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_user(cls, user, token_exp: Optional[float] = None, ttl: int = AUTH_CACHE_TTL_SECONDS):
+        expires_at = time.time() + ttl
+        if token_exp:
+            expires_at = min(expires_at, float(token_exp))
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            institute_id=user.institute_id,
+            is_active=bool(user.is_active),
+            expires_at=expires_at
+        )
+
+
+class PrincipalCache:
+    """
+    Bounded LRU + TTL cache of AuthPrincipal keyed by token hash.
+
+    The cache is per process: explicit invalidation only reaches the worker
+    that handled the write, other workers catch up within the TTL.
+    """
+
+    def __init__(self, max_size: int = AUTH_CACHE_MAX_SIZE, ttl: int = AUTH_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, AuthPrincipal]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        """Raw tokens are never kept in memory, only their SHA-256"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[AuthPrincipal]:
+        key = self.token_key(token)
+        with self._lock:
+            principal = self._entries.get(key)
+            if principal is None or principal.expires_at <= time.time():
+                if principal is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: AuthPrincipal) -> None:
+        key = self.token_key(token)
+        with self._lock:
+            self._entries[key] = principal
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(self.token_key(token), None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of a user (status, password or email changed)"""
+        with self._lock:
+            for key in [k for k, p in self._entries.items() if p.id == user_id]:
+                del self._entries[key]
+
+    def invalidate_institute(self, institute_id: str) -> None:
+        """Drop every cached token of an institute's users"""
+        with self._lock:
+            for key in [k for k, p in self._entries.items() if p.institute_id == institute_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+                "checked_at": datetime.utcnow().isoformat()
+            }
+
+
+principal_cache = PrincipalCache()
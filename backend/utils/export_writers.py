@@ -0,0 +1,178 @@
+# utils/export_writers.py
+import csv
+from io import StringIO
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows fetched per round trip and written per yielded chunk
+EXPORT_BATCH_SIZE = 1000
+# Finished workbooks larger than this are rolled over from memory to disk
+EXCEL_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Bytes per chunk when streaming a finished file
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Rows per Parquet row group / Arrow record batch
+ARROW_BATCH_SIZE = 65536
+
+EXCEL_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Columnar formats: format -> (file extension, content type)
+ARROW_FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file")
+}
+ARROW_FIELD_TYPES = ("int", "float", "string", "category", "date", "timestamp")
+
+
+def iter_csv(
+    rows: Iterable[Any],
+    columns: List[str],
+    format_row: Callable[[Any], List[Any]],
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Write rows as CSV text, yielding one chunk per batch_size rows.
+    Only the current batch is held in memory, so memory stays constant
+    no matter how many rows rows produces.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(format_row(row))
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
+
+
+def write_excel(
+    sheets: Iterable[Tuple[str, List[str], Iterable[List[Any]]]]
+) -> SpooledTemporaryFile:
+    """
+    Write (sheet name, header, rows) sheets into an .xlsx workbook in
+    write-only mode: rows are streamed to disk as they are appended instead
+    of being kept as a worksheet DOM, so memory stays constant.
+
+    Returns: temp file positioned at 0 (kept in memory while small)
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+
+    for sheet_name, columns, rows in sheets:
+        sheet = workbook.create_sheet(title=sheet_name)
+
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = header_font
+            header.append(cell)
+        sheet.append(header)
+
+        for row in rows:
+            sheet.append(row)
+
+    output = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES)
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def iter_file(fileobj: IO[bytes], chunk_size: int = FILE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file in chunks for a StreamingResponse, closing it when done"""
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def write_arrow(
+    rows: Iterable[Tuple[Any, ...]],
+    fields: List[Tuple[str, str]],
+    format: str,
+    metadata: Optional[Dict[str, str]] = None,
+    batch_size: int = ARROW_BATCH_SIZE
+) -> SpooledTemporaryFile:
+    """
+    Write rows (tuples in fields order) as a Parquet file or an Arrow IPC
+    file, one record batch / row group per batch_size rows.
+
+    fields are (name, type) with type one of ARROW_FIELD_TYPES; "category"
+    columns are dictionary encoded with one dictionary that only grows, so
+    IPC files can carry it as deltas.
+
+    Raises ImportError when pyarrow is not installed.
+    """
+    import pyarrow as pa
+
+    types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC")
+    }
+    schema = pa.schema(
+        [pa.field(name, types[field_type]) for name, field_type in fields],
+        metadata=metadata
+    )
+
+    # value -> dictionary index, per category column
+    dictionaries = {i: {} for i, (_, field_type) in enumerate(fields) if field_type == "category"}
+
+    def record_batch(columns):
+        arrays = []
+        for i, values in enumerate(columns):
+            if i in dictionaries:
+                codes = dictionaries[i]
+                indices = [None if v is None else codes.setdefault(v, len(codes)) for v in values]
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(indices, type=pa.int32()),
+                    pa.array(list(codes), type=pa.string())
+                ))
+            else:
+                arrays.append(pa.array(values, type=schema.field(i).type))
+        return pa.record_batch(arrays, schema=schema)
+
+    output = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES)
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(output, schema)
+    elif format == "arrow":
+        writer = pa.ipc.new_file(
+            output, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        )
+    else:
+        raise ValueError(f"Unsupported columnar format: {format}")
+
+    try:
+        columns = [[] for _ in fields]
+        for count, row in enumerate(rows, 1):
+            for column, value in zip(columns, row):
+                column.append(value)
+            if count % batch_size == 0:
+                writer.write_batch(record_batch(columns))
+                columns = [[] for _ in fields]
+
+        if columns and columns[0]:
+            writer.write_batch(record_batch(columns))
+    finally:
+        writer.close()
+
+    output.seek(0)
+    return output
@@ -1,7 +1,7 @@
 # utils/faculty_assignment.py
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from datetime import date, timedelta
 
 # Import your models
@@ -10,6 +10,8 @@ from models.faculty import Faculty
 from models.faculty_class import FacultyClass
 from models.faculty_student import FacultyStudent
 from models.attendance import Attendance
+from utils.school_calendar import get_working_calendar
+from utils.attendance_bitsets import attendance_bitsets
 
 
 async def auto_assign_student_to_faculty(student: Student, db: Session) -> List[int]:
@@ -74,39 +76,48 @@ async def auto_assign_student_to_faculty(student: Student, db: Session) -> List[
     
     return assigned_faculty
 
-def calculate_student_attendance_percentage(student_id: int, db: Session, days_back: int = 30) -> float:
+def calculate_attendance_percentages(
+    student_ids: Iterable[int],
+    start_date: date,
+    end_date: date,
+    db: Session,
+    institute_id: Optional[str] = None
+) -> Dict[int, float]:
     """
-    Calculate attendance percentage for a student over last N days
-    """
-    # Count total school days in last N days (excluding weekends)
-    end_date = date.today()
-    start_date = end_date - timedelta(days=days_back)
+    Calculate attendance percentage for many students over the same period
+    from the cached attendance bitsets; school days come from the institute calendar
     
-    # Generate list of school days (Monday-Friday)
-    school_days = []
-    current_date = start_date
-    while current_date <= end_date:
-        # Check if it's a weekday (0=Monday, 4=Friday)
-        if current_date.weekday() < 5:
-            school_days.append(current_date)
-        current_date += timedelta(days=1)
-    
-    total_school_days = len(school_days)
+    Returns:
+        {student_id: percentage} (0.0 for students without attendance)
+    """
+    student_ids = list(student_ids)
+    percentages = {student_id: 0.0 for student_id in student_ids}
     
-    if total_school_days == 0:
-        return 0.0
+    # Count total school days once for everyone (excluding weekends and holidays)
+    total_school_days = get_working_calendar(institute_id, db).count(start_date, end_date)
     
-    # Count attendance records for this student
-    attendance_records = db.query(Attendance).filter(
-        Attendance.student_id == student_id,
-        Attendance.attendance_date >= start_date,
-        Attendance.attendance_date <= end_date
-    ).all()
+    if not student_ids or total_school_days == 0:
+        return percentages
     
     # For AI-recorded attendance: if record exists → PRESENT
-    present_days = len(attendance_records)
+    present_counts = attendance_bitsets.count_many(db, student_ids, start_date, end_date)
+    
+    for student_id, present_days in present_counts.items():
+        percentages[student_id] = round((present_days / total_school_days) * 100, 2)
     
-    # Calculate percentage
-    percentage = (present_days / total_school_days) * 100
+    return percentages
+
+
+def calculate_student_attendance_percentage(
+    student_id: int,
+    db: Session,
+    days_back: int = 30,
+    institute_id: Optional[str] = None
+) -> float:
+    """
+    Calculate attendance percentage for a student over last N days
+    """
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days_back)
     
-    return round(percentage, 2)
+    return calculate_attendance_percentages([student_id], start_date, end_date, db, institute_id)[student_id]
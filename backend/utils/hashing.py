@@ -1,9 +1,35 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated, bounded pool for bcrypt so logins never run on the event loop
+# and a login burst cannot take every thread of the default executor
+HASHING_POOL_SIZE = int(os.getenv("HASHING_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+_hashing_executor = ThreadPoolExecutor(max_workers=HASHING_POOL_SIZE, thread_name_prefix="bcrypt")
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt pool; await from async endpoints"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hashing_executor, hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password on the bcrypt pool; await from async endpoints"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hashing_executor, verify_password, password, hashed)
+
+def hash_password_pooled(password: str) -> str:
+    """hash_password on the bcrypt pool; call from sync (threadpool) endpoints"""
+    return _hashing_executor.submit(hash_password, password).result()
+
+def verify_password_pooled(password: str, hashed: str) -> bool:
+    """verify_password on the bcrypt pool; call from sync (threadpool) endpoints"""
+    return _hashing_executor.submit(verify_password, password, hashed).result()
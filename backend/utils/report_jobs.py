@@ -0,0 +1,169 @@
+# utils/report_jobs.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+# Reports rendered at the same time; further jobs wait in the queue
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+# Seconds a finished report stays downloadable
+REPORT_JOB_TTL_SECONDS = int(os.getenv("REPORT_JOB_TTL_SECONDS", "3600"))
+# Where finished report files are kept
+REPORT_JOB_DIR = os.getenv(
+    "REPORT_JOB_DIR", os.path.join(tempfile.gettempdir(), "neuroface_reports")
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# render(set_progress) -> (content file object, content_type, filename)
+RenderFn = Callable[[Callable[[int], None]], Tuple]
+
+
+class ReportJob:
+    """State of one background report"""
+
+    def __init__(self, job_id: str, key: str, institute_id: str, format: str):
+        self.id = job_id
+        self.key = key
+        self.institute_id = institute_id
+        self.format = format
+        self.status = QUEUED
+        self.progress = 0
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "format": self.format,
+            "filename": self.filename,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "expires_at": datetime.utcfromtimestamp(self.expires_at).isoformat() if self.expires_at else None
+        }
+
+
+class ReportJobManager:
+    """
+    Runs report rendering on a bounded thread pool and keeps the finished
+    files on local disk for REPORT_JOB_TTL_SECONDS.
+
+    Identical requests (same key) submitted while a job is queued or running
+    attach to that job instead of rendering again. Jobs live in process
+    memory, so status and downloads are only served by the worker that
+    accepted the job.
+    """
+
+    def __init__(self, workers: int = REPORT_JOB_WORKERS, ttl: int = REPORT_JOB_TTL_SECONDS,
+                 directory: str = REPORT_JOB_DIR):
+        self.ttl = ttl
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-job")
+        self._jobs: Dict[str, ReportJob] = {}
+        self._active: Dict[str, str] = {}  # key -> id of queued/running job
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(institute_id: str, format: str, filters: dict) -> str:
+        """Identity of a report request: institute, filters and format"""
+        raw = json.dumps([institute_id, format.lower(), filters], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def submit(self, institute_id: str, format: str, filters: dict, render: RenderFn) -> ReportJob:
+        """Queue a report, or return the in-flight job for the same request"""
+        self.purge_expired()
+        key = self.job_key(institute_id, format, filters)
+
+        with self._lock:
+            active_id = self._active.get(key)
+            if active_id:
+                return self._jobs[active_id]
+
+            job = ReportJob(uuid.uuid4().hex, key, institute_id, format.lower())
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+
+        self._executor.submit(self._run, job, render)
+        return job
+
+    def get(self, job_id: str, institute_id: str) -> Optional[ReportJob]:
+        """Job by id, only visible to its own institute"""
+        self.purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.institute_id != institute_id:
+            return None
+        return job
+
+    def _run(self, job: ReportJob, render: RenderFn) -> None:
+        job.status = RUNNING
+
+        def set_progress(progress: int):
+            job.progress = max(job.progress, min(int(progress), 99))
+
+        try:
+            content, content_type, filename = render(set_progress)
+
+            # Keep the artifact on disk, the rendered buffer is released
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, job.id)
+            try:
+                with open(path, "wb") as artifact:
+                    shutil.copyfileobj(content, artifact)
+            finally:
+                content.close()
+
+            job.path = path
+            job.filename = filename
+            job.content_type = content_type
+            job.expires_at = time.time() + self.ttl
+            job.progress = 100
+            job.status = COMPLETED
+
+        except Exception as e:
+            print(f"Error in report job {job.id}: {str(e)}")
+            job.error = str(e)
+            job.expires_at = time.time() + self.ttl
+            job.status = FAILED
+
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                if self._active.get(job.key) == job.id:
+                    del self._active[job.key]
+
+    def purge_expired(self) -> None:
+        """Forget finished jobs past their TTL and delete their files"""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+
+        for job in expired:
+            if job.path:
+                try:
+                    os.remove(job.path)
+                except OSError:
+                    pass
+
+
+report_jobs = ReportJobManager()
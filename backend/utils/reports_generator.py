@@ -2,71 +2,24 @@
 import pandas as pd
 import numpy as np
 from io import BytesIO
+import asyncio
 import csv
 import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional
+from tempfile import SpooledTemporaryFile
+from typing import List, Dict, Any, Iterator, Optional
 
-class ReportGenerator:
-    def __init__(self, institute_name: str):
-        self.institute_name = institute_name
-    
-    def generate_excel_report(self, data: List[Dict], stats: Dict, filters: Dict) -> BytesIO:
-        """Generate Excel report for attendance data"""
-        buffer = BytesIO()
-        
-        # Create DataFrame
-        df = pd.DataFrame(data) if data else pd.DataFrame()
-        
-        if not df.empty:
-            # Format columns if they exist
-            if 'attendance_percentage' in df.columns:
-                df['attendance_percentage'] = df['attendance_percentage'].apply(
-                    lambda x: f"{float(x):.1f}%" if pd.notnull(x) else "0.0%"
-                )
-            
-            # Format dates if they exist
-            date_columns = ['last_attendance', 'attendance_date', 'created_at']
-            for col in date_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%Y-%m-%d')
-        
-        # Create Excel writer
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            # Write main data
-            df.to_excel(writer, sheet_name='Attendance Report', index=False)
-            
-            # Create summary sheet
-            summary_data = {
-                'Metric': ['Institute Name', 'Total Students', 'Average Attendance', 
-                          'Present Count', 'Absent Count', 'Total Days',
-                          'Report Period', 'Generated At', 'Class Filter', 'Stream Filter'],
-                'Value': [
-                    self.institute_name,
-                    stats.get('total_students', 0),
-                    f"{stats.get('average_attendance', 0):.1f}%",
-                    stats.get('present_count', 0),
-                    stats.get('absent_count', 0),
-                    stats.get('total_days', 0),
-                    f"{filters.get('start_date', 'N/A')} to {filters.get('end_date', 'N/A')}",
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    filters.get('class_filter', 'All'),
-                    filters.get('stream_filter', 'All')
-                ]
-            }
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        buffer.seek(0)
-        return buffer
-    
-    def generate_html_report(self, data: List[Dict], stats: Dict, filters: Dict) -> BytesIO:
-        """Generate HTML report for attendance data"""
-        html_content = f"""
-        <!DOCTYPE html>
+from utils.export_writers import write_excel, write_arrow, EXCEL_CONTENT_TYPE, EXCEL_SPOOL_MAX_BYTES, ARROW_FORMATS
+
+# Precompiled HTML report templates (filled with str.format)
+HTML_REPORT_HEAD = """        <!DOCTYPE html>
         <html>
         <head>
-            <title>Attendance Report - {self.institute_name}</title>
+            <title>Attendance Report - {institute_name}</title>
             <style>
                 body {{
                     font-family: Arial, sans-serif;
@@ -157,44 +110,42 @@ class ReportGenerator:
         <body>
             <div class="header">
                 <div class="title">Attendance Report</div>
-                <div class="subtitle">{self.institute_name}</div>
-                <div class="subtitle">Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+                <div class="subtitle">{institute_name}</div>
+                <div class="subtitle">Generated on {generated_at}</div>
             </div>
             
             <div class="stats-grid">
                 <div class="stat-card">
                     <div class="stat-label">Total Students</div>
-                    <div class="stat-value">{stats.get('total_students', 0)}</div>
+                    <div class="stat-value">{total_students}</div>
                 </div>
                 <div class="stat-card">
                     <div class="stat-label">Average Attendance</div>
-                    <div class="stat-value">{stats.get('average_attendance', 0):.1f}%</div>
+                    <div class="stat-value">{average_attendance:.1f}%</div>
                 </div>
                 <div class="stat-card">
                     <div class="stat-label">Present Days</div>
-                    <div class="stat-value">{stats.get('present_count', 0)}</div>
+                    <div class="stat-value">{present_count}</div>
                 </div>
                 <div class="stat-card">
                     <div class="stat-label">Absent Students</div>
-                    <div class="stat-value">{stats.get('absent_count', 0)}</div>
+                    <div class="stat-value">{absent_count}</div>
                 </div>
                 <div class="stat-card">
                     <div class="stat-label">Total Days</div>
-                    <div class="stat-value">{stats.get('total_days', 0)}</div>
+                    <div class="stat-value">{total_days}</div>
                 </div>
             </div>
             
             <div class="filters">
                 <strong>Filters Applied:</strong><br/>
-                • Class: {filters.get('class_filter', 'All')}<br/>
-                • Stream: {filters.get('stream_filter', 'All')}<br/>
-                • Date Range: {filters.get('start_date', 'N/A')} to {filters.get('end_date', 'N/A')}
+                • Class: {class_filter}<br/>
+                • Stream: {stream_filter}<br/>
+                • Date Range: {start_date} to {end_date}
             </div>
-        """
-        
-        if data:
-            html_content += """
-            <table>
+"""
+
+HTML_TABLE_HEAD = """            <table>
                 <thead>
                     <tr>
                         <th>Roll No</th>
@@ -208,71 +159,264 @@ class ReportGenerator:
                     </tr>
                 </thead>
                 <tbody>
-            """
-            
-            for record in data:
-                attendance_pct = 0
-                try:
-                    attendance_pct = float(record.get('attendance_percentage', 0))
-                except (ValueError, TypeError):
-                    attendance_pct = 0
-                
-                status_class = "attendance-high"
-                if attendance_pct < 50:
-                    status_class = "attendance-low"
-                elif attendance_pct < 75:
-                    status_class = "attendance-medium"
-                
-                last_attendance = record.get('last_attendance', '')
-                if last_attendance:
-                    try:
-                        if isinstance(last_attendance, (date, datetime)):
-                            last_attendance = last_attendance.strftime('%Y-%m-%d')
-                        elif isinstance(last_attendance, str):
-                            try:
-                                dt = datetime.fromisoformat(last_attendance.replace('Z', '+00:00'))
-                                last_attendance = dt.strftime('%Y-%m-%d')
-                            except:
-                                pass
-                    except:
-                        pass
-                
-                html_content += f"""
-                    <tr>
-                        <td>{record.get('roll_no', '')}</td>
-                        <td>{record.get('student_name', '')}</td>
-                        <td>{record.get('class_name', 'N/A')}</td>
-                        <td>{record.get('stream', 'N/A')}</td>
-                        <td class="{status_class}">{attendance_pct:.1f}%</td>
-                        <td>{record.get('present_days', 0)}</td>
-                        <td>{record.get('total_days', 0)}</td>
-                        <td>{last_attendance}</td>
+"""
+
+HTML_ROW = """                    <tr>
+                        <td>{}</td>
+                        <td>{}</td>
+                        <td>{}</td>
+                        <td>{}</td>
+                        <td class="{}">{}</td>
+                        <td>{}</td>
+                        <td>{}</td>
+                        <td>{}</td>
                     </tr>
-                """
-            
-            html_content += """
+""".format
+
+HTML_TABLE_TAIL = """
                 </tbody>
             </table>
-            """
-        else:
-            html_content += """
-            <div style="text-align: center; padding: 40px; color: #7f8c8d;">
+"""
+
+HTML_NO_DATA = """            <div style="text-align: center; padding: 40px; color: #7f8c8d;">
                 <h3>No data available for the selected filters</h3>
                 <p>Try adjusting your filter criteria</p>
             </div>
-            """
-        
-        html_content += """
-            <div class="footer">
+"""
+
+HTML_REPORT_FOOT = """            <div class="footer">
                 <p>Generated by NeuroFace AI Attendance System</p>
                 <p>© 2026 All Rights Reserved</p>
             </div>
         </body>
         </html>
+"""
+
+# Table rows rendered per yielded chunk
+HTML_ROW_BATCH = 1000
+
+# Typed columns of Parquet/Arrow reports: (record key, type)
+ARROW_REPORT_FIELDS = [
+    ('roll_no', 'string'), ('student_name', 'string'), ('class_name', 'category'),
+    ('stream', 'category'), ('attendance_percentage', 'float'), ('present_days', 'int'),
+    ('total_days', 'int'), ('last_attendance', 'date'), ('email', 'string'), ('phone', 'string')
+]
+
+# JSON report records encoded per yielded chunk
+JSON_ROW_BATCH = 1000
+
+# PDF table rows per table, sized to fill one landscape letter page (header repeated on each)
+PDF_ROWS_PER_TABLE = 22
+# Fraction of the page width per PDF column
+PDF_COLUMN_SHARES = (0.12, 0.24, 0.10, 0.14, 0.12, 0.12, 0.16)
+# Processes rendering PDFs; each renders one report at a time
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _json_default(obj):
+    """json.JSONEncoder default: dates as ISO strings"""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF rendering, started on first use"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_pool
+
+
+def render_pdf_report(institute_name: str, data: List[Dict], stats: Dict, filters: Dict) -> bytes:
+    """Render a PDF report in a pool process"""
+    return ReportGenerator(institute_name).generate_pdf_report(data, stats, filters).getvalue()
+
+class ReportGenerator:
+    SUPPORTED_FORMATS = ('excel', 'html', 'json', 'pdf', 'parquet', 'arrow')
+    
+    def __init__(self, institute_name: str):
+        self.institute_name = institute_name
+    
+    @staticmethod
+    def _excel_date(value) -> Optional[str]:
+        """Format a date/datetime/ISO string as YYYY-MM-DD, None if not a date"""
+        if isinstance(value, (date, datetime)):
+            return value.strftime('%Y-%m-%d')
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+            except ValueError:
+                return None
+        return None
+    
+    def generate_excel_report(self, data: List[Dict], stats: Dict, filters: Dict) -> SpooledTemporaryFile:
+        """
+        Generate Excel report for attendance data
+        Rows are written one at a time in write-only mode and the workbook is
+        spooled to a temp file
+        """
+        columns = list(data[0].keys()) if data else []
+        
+        date_columns = {'last_attendance', 'attendance_date', 'created_at'}
+        
+        def report_rows():
+            for record in data:
+                row = []
+                for col in columns:
+                    value = record.get(col)
+                    # Format columns if they exist
+                    if col == 'attendance_percentage':
+                        value = f"{float(value):.1f}%" if value is not None else "0.0%"
+                    elif col in date_columns:
+                        value = self._excel_date(value)
+                    row.append(value)
+                yield row
+        
+        # Summary sheet
+        summary_rows = zip(
+            ['Institute Name', 'Total Students', 'Average Attendance', 
+             'Present Count', 'Absent Count', 'Total Days',
+             'Report Period', 'Generated At', 'Class Filter', 'Stream Filter'],
+            [
+                self.institute_name,
+                stats.get('total_students', 0),
+                f"{stats.get('average_attendance', 0):.1f}%",
+                stats.get('present_count', 0),
+                stats.get('absent_count', 0),
+                stats.get('total_days', 0),
+                f"{filters.get('start_date', 'N/A')} to {filters.get('end_date', 'N/A')}",
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                filters.get('class_filter', 'All'),
+                filters.get('stream_filter', 'All')
+            ]
+        )
+        
+        return write_excel([
+            ('Attendance Report', columns, report_rows()),
+            ('Summary', ['Metric', 'Value'], ([metric, value] for metric, value in summary_rows))
+        ])
+    
+    @staticmethod
+    def _report_dates(values: List[Any]) -> List[Any]:
         """
+        Normalise date values to YYYY-MM-DD, converting each distinct value once
+        (a roster has far fewer distinct dates than rows)
         
-        # Convert HTML string to BytesIO
-        buffer = BytesIO(html_content.encode('utf-8'))
+        Strings that are not ISO dates are kept as they are
+        """
+        converted = {}
+        for value in set(v for v in values if v and isinstance(v, (date, datetime, str))):
+            if isinstance(value, (date, datetime)):
+                converted[value] = value.strftime('%Y-%m-%d')
+            else:
+                try:
+                    converted[value] = datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+                except ValueError:
+                    converted[value] = value
+        return [converted.get(v, v) if v else v for v in values]
+    
+    @staticmethod
+    def _report_date_values(values: List[Any]) -> List[Optional[date]]:
+        """
+        Dates as date objects, converting each distinct value once
+        
+        Values that are not dates or ISO date strings become None
+        """
+        converted = {}
+        for value in set(v for v in values if v and isinstance(v, (date, datetime, str))):
+            if isinstance(value, datetime):
+                converted[value] = value.date()
+            elif isinstance(value, date):
+                converted[value] = value
+            else:
+                try:
+                    converted[value] = datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+                except ValueError:
+                    converted[value] = None
+        return [converted.get(v) if v else None for v in values]
+    
+    @staticmethod
+    def _attendance_columns(data: List[Dict]):
+        """
+        Attendance percentage as floats (unparseable values count as 0), the
+        formatted percentage text and the CSS status class, for all rows at once
+        """
+        percentages = pd.to_numeric(
+            pd.Series([record.get('attendance_percentage', 0) for record in data], dtype=object),
+            errors='coerce'
+        ).fillna(0).to_numpy(dtype=float)
+        
+        percentage_text = np.char.add(np.char.mod('%.1f', percentages), '%')
+        status_classes = np.select(
+            [percentages < 50, percentages < 75],
+            ['attendance-low', 'attendance-medium'],
+            default='attendance-high'
+        )
+        return percentages, percentage_text, status_classes
+    
+    def iter_html_report(self, data: List[Dict], stats: Dict, filters: Dict,
+                         batch_size: int = HTML_ROW_BATCH) -> Iterator[str]:
+        """
+        Render the HTML report as chunks: header and stats, table rows in
+        batches of batch_size, then the footer (for StreamingResponse)
+        """
+        yield HTML_REPORT_HEAD.format(
+            institute_name=self.institute_name,
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            total_students=stats.get('total_students', 0),
+            average_attendance=stats.get('average_attendance', 0),
+            present_count=stats.get('present_count', 0),
+            absent_count=stats.get('absent_count', 0),
+            total_days=stats.get('total_days', 0),
+            class_filter=filters.get('class_filter', 'All'),
+            stream_filter=filters.get('stream_filter', 'All'),
+            start_date=filters.get('start_date', 'N/A'),
+            end_date=filters.get('end_date', 'N/A')
+        )
+        
+        if data:
+            # Per-row conversions done once for the whole column
+            _, percentage_text, status_classes = self._attendance_columns(data)
+            last_attendance = self._report_dates([record.get('last_attendance', '') for record in data])
+            
+            yield HTML_TABLE_HEAD
+            
+            for start in range(0, len(data), batch_size):
+                end = min(start + batch_size, len(data))
+                yield "".join(
+                    HTML_ROW(
+                        record.get('roll_no', ''),
+                        record.get('student_name', ''),
+                        record.get('class_name', 'N/A'),
+                        record.get('stream', 'N/A'),
+                        status_classes[i],
+                        percentage_text[i],
+                        record.get('present_days', 0),
+                        record.get('total_days', 0),
+                        last_attendance[i]
+                    )
+                    for i, record in enumerate(data[start:end], start)
+                )
+            
+            yield HTML_TABLE_TAIL
+        else:
+            yield HTML_NO_DATA
+        
+        yield HTML_REPORT_FOOT
+    
+    def generate_html_report(self, data: List[Dict], stats: Dict, filters: Dict) -> SpooledTemporaryFile:
+        """Generate HTML report for attendance data"""
+        buffer = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES)
+        for chunk in self.iter_html_report(data, stats, filters):
+            buffer.write(chunk.encode('utf-8'))
         buffer.seek(0)
         return buffer
     
@@ -319,43 +463,28 @@ class ReportGenerator:
             elements.append(Paragraph(stats_text, styles['Normal']))
             elements.append(Spacer(1, 12))
             
-            # Data table
+            # Data table, split into page-sized tables so layout stays linear
             if data:
-                table_data = [['Roll No', 'Student Name', 'Class', 'Stream', 'Attendance %', 'Present Days', 'Last Attendance']]
+                header = ['Roll No', 'Student Name', 'Class', 'Stream', 'Attendance %', 'Present Days', 'Last Attendance']
                 
-                for record in data:
-                    attendance_pct = 0
-                    try:
-                        attendance_pct = float(record.get('attendance_percentage', 0))
-                    except (ValueError, TypeError):
-                        attendance_pct = 0
-                    
-                    last_attendance = record.get('last_attendance', '')
-                    if last_attendance:
-                        try:
-                            if isinstance(last_attendance, (date, datetime)):
-                                last_attendance = last_attendance.strftime('%Y-%m-%d')
-                            elif isinstance(last_attendance, str):
-                                try:
-                                    dt = datetime.fromisoformat(last_attendance.replace('Z', '+00:00'))
-                                    last_attendance = dt.strftime('%Y-%m-%d')
-                                except:
-                                    last_attendance = str(last_attendance)
-                        except:
-                            last_attendance = str(last_attendance)
-                    
-                    table_data.append([
+                # Per-row conversions done once for the whole column
+                _, percentage_text, _ = self._attendance_columns(data)
+                last_attendance = self._report_dates([record.get('last_attendance', '') for record in data])
+                
+                table_rows = [
+                    [
                         str(record.get('roll_no', '')),
                         str(record.get('student_name', '')),
                         str(record.get('class_name', 'N/A')),
                         str(record.get('stream', 'N/A')),
-                        f"{attendance_pct:.1f}%",
+                        str(percentage_text[i]),
                         str(record.get('present_days', 0)),
-                        str(last_attendance)
-                    ])
+                        str(last_attendance[i])
+                    ]
+                    for i, record in enumerate(data)
+                ]
                 
-                table = Table(table_data)
-                table.setStyle(TableStyle([
+                table_style = TableStyle([
                     ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                     ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                     ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -364,8 +493,18 @@ class ReportGenerator:
                     ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
                     ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
                     ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(table)
+                ])
+                # Same column widths on every page
+                col_widths = [doc.width * share for share in PDF_COLUMN_SHARES]
+                
+                for start in range(0, len(table_rows), PDF_ROWS_PER_TABLE):
+                    table = Table(
+                        [header] + table_rows[start:start + PDF_ROWS_PER_TABLE],
+                        colWidths=col_widths,
+                        repeatRows=1
+                    )
+                    table.setStyle(table_style)
+                    elements.append(table)
             
             # Build PDF
             doc.build(elements)
@@ -422,46 +561,117 @@ class ReportGenerator:
             buffer.seek(0)
             return buffer
     
-    def generate_json_report(self, data: List[Dict], stats: Dict, filters: Dict) -> BytesIO:
-        """Generate JSON report for attendance data"""
-        report = {
-            "institute": self.institute_name,
-            "generated_at": datetime.now().isoformat(),
-            "filters": filters,
-            "statistics": stats,
-            "data": data,
-            "count": len(data)
-        }
+    def iter_json_report(self, data: List[Dict], stats: Dict, filters: Dict,
+                         indent: Optional[int] = None, batch_size: int = JSON_ROW_BATCH) -> Iterator[str]:
+        """
+        Serialize the JSON report in one pass, yielding the data array in
+        batches of batch_size records (for StreamingResponse)
         
-        # Convert dates to strings for JSON serialization
-        def convert_dates(obj):
-            if isinstance(obj, (date, datetime)):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: convert_dates(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_dates(item) for item in obj]
-            return obj
+        Dates are encoded by the encoder itself. Compact by default; with
+        indent the output matches json.dumps(report, indent=indent).
+        """
+        encoder = json.JSONEncoder(
+            indent=indent,
+            separators=(',', ': ') if indent is not None else (',', ':'),
+            default=_json_default
+        )
         
-        report = convert_dates(report)
-        json_str = json.dumps(report, indent=2)
+        if indent is not None:
+            pad = "\n" + " " * indent
+            item_pad = "\n" + " " * (indent * 2)
+            key_sep = ": "
+        else:
+            pad = item_pad = ""
+            key_sep = ":"
         
-        # Convert JSON string to BytesIO
-        buffer = BytesIO(json_str.encode('utf-8'))
+        def nested(value, depth: int) -> str:
+            # Encoded at top level, then shifted to its depth in the report
+            encoded = encoder.encode(value)
+            if indent is not None:
+                encoded = encoded.replace("\n", "\n" + " " * (indent * depth))
+            return encoded
+        
+        def field(key: str, value: str) -> str:
+            return pad + encoder.encode(key) + key_sep + value
+        
+        yield "{" + ",".join([
+            field("institute", encoder.encode(self.institute_name)),
+            field("generated_at", encoder.encode(datetime.now().isoformat())),
+            field("filters", nested(filters, 1)),
+            field("statistics", nested(stats, 1)),
+            field("data", "")
+        ])
+        
+        if data:
+            yield "["
+            for start in range(0, len(data), batch_size):
+                yield ("," if start else "") + ",".join(
+                    item_pad + nested(record, 2) for record in data[start:start + batch_size]
+                )
+            yield pad + "]"
+        else:
+            yield "[]"
+        
+        yield "," + field("count", str(len(data))) + ("\n}" if indent is not None else "}")
+    
+    def generate_json_report(self, data: List[Dict], stats: Dict, filters: Dict,
+                             indent: Optional[int] = None) -> SpooledTemporaryFile:
+        """Generate JSON report for attendance data"""
+        buffer = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES)
+        for chunk in self.iter_json_report(data, stats, filters, indent=indent):
+            buffer.write(chunk.encode('utf-8'))
         buffer.seek(0)
         return buffer
     
-    def generate_report(self, data: List[Dict], stats: Dict, filters: Dict, format: str) -> tuple:
+    def generate_arrow_report(self, data: List[Dict], stats: Dict, filters: Dict,
+                              format: str = 'parquet') -> SpooledTemporaryFile:
+        """
+        Generate Parquet or Arrow IPC report for attendance data
+        Typed columns; statistics and filters go in the schema metadata
+        """
+        percentages, _, _ = self._attendance_columns(data)
+        last_attendance = self._report_date_values([record.get('last_attendance') for record in data])
+        
+        def report_rows():
+            for i, record in enumerate(data):
+                yield (
+                    record.get('roll_no'),
+                    record.get('student_name'),
+                    record.get('class_name'),
+                    record.get('stream'),
+                    float(percentages[i]),
+                    record.get('present_days'),
+                    record.get('total_days'),
+                    last_attendance[i],
+                    record.get('email'),
+                    record.get('phone')
+                )
+        
+        metadata = {
+            'institute': self.institute_name,
+            'generated_at': datetime.now().isoformat(),
+            'filters': json.dumps(filters, default=_json_default),
+            'statistics': json.dumps(stats, default=_json_default)
+        }
+        return write_arrow(report_rows(), ARROW_REPORT_FIELDS, format, metadata=metadata)
+    
+    @staticmethod
+    def report_filename(extension: str = "") -> str:
+        """Timestamped report file name, e.g. attendance_report_20240131_101500.html"""
+        return f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+    
+    def generate_report(self, data: List[Dict], stats: Dict, filters: Dict, format: str,
+                        indent: Optional[int] = None) -> tuple:
         """
         Generate report in specified format
         
-        Returns: (content: BytesIO, content_type: str, filename: str)
+        Returns: (content: file object, content_type: str, filename: str)
         """
-        filename = f"attendance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filename = self.report_filename()
         
         if format.lower() == 'excel':
             content = self.generate_excel_report(data, stats, filters)
-            content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            content_type = EXCEL_CONTENT_TYPE
             filename += ".xlsx"          
             
         elif format.lower() == 'html':
@@ -470,18 +680,26 @@ class ReportGenerator:
             filename += ".html"
             
         elif format.lower() == 'json':
-            content = self.generate_json_report(data, stats, filters)
+            content = self.generate_json_report(data, stats, filters, indent=indent)
             content_type = "application/json"
             filename += ".json"
             
+        elif format.lower() in ARROW_FORMATS:
+            content = self.generate_arrow_report(data, stats, filters, format.lower())
+            extension, content_type = ARROW_FORMATS[format.lower()]
+            filename += extension
+            
         elif format.lower() == 'pdf':
-            content = self.generate_pdf_report(data, stats, filters)
+            # Rendered in the PDF process pool, off this thread's GIL
+            content = BytesIO(
+                get_pdf_pool().submit(render_pdf_report, self.institute_name, data, stats, filters).result()
+            )
             content_type = "application/pdf"
             filename += ".pdf"
             
         
-        # Make sure content is BytesIO
-        if not isinstance(content, BytesIO):
+        # Make sure content is a readable file (BytesIO or spooled temp file)
+        if not isinstance(content, (BytesIO, SpooledTemporaryFile)):
             # Convert to BytesIO if it's not already
             if isinstance(content, str):
                 content = BytesIO(content.encode('utf-8'))
@@ -497,4 +715,22 @@ class ReportGenerator:
         # Make sure all content is at position 0
         content.seek(0)
         
-        return content, content_type, filename
\ No newline at end of file
+        return content, content_type, filename
+    
+    async def generate_report_async(self, data: List[Dict], stats: Dict, filters: Dict, format: str,
+                                    indent: Optional[int] = None) -> tuple:
+        """
+        generate_report without blocking the event loop: PDFs are awaited
+        from the process pool, other formats run in the default thread pool
+        
+        Returns: (content: file object, content_type: str, filename: str)
+        """
+        loop = asyncio.get_running_loop()
+        
+        if format.lower() == 'pdf':
+            pdf = await loop.run_in_executor(
+                get_pdf_pool(), render_pdf_report, self.institute_name, data, stats, filters
+            )
+            return BytesIO(pdf), "application/pdf", self.report_filename(".pdf")
+        
+        return await loop.run_in_executor(None, self.generate_report, data, stats, filters, format, indent)
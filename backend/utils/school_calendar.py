@@ -0,0 +1,142 @@
+# utils/school_calendar.py
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+# Import your models
+from models.institute_calendar import InstituteCalendar
+from models.institute_holiday import InstituteHoliday
+
+# Monday..Sunday, "1" = working day
+DEFAULT_WEEKMASK = "1111100"
+# Seconds an institute calendar is reused before it is reloaded
+CALENDAR_CACHE_TTL_SECONDS = int(os.getenv("CALENDAR_CACHE_TTL_SECONDS", "300"))
+# Time zone the institutes keep attendance in (attendance dates are local dates)
+INSTITUTE_TIMEZONE = ZoneInfo(os.getenv("INSTITUTE_TIMEZONE", "Asia/Kolkata"))
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+def weekmask_from_weekend_days(weekend_days: Iterable[int]) -> str:
+    """Weekmask for the given weekend days (0=Monday ... 6=Sunday)"""
+    weekend_days = set(weekend_days)
+    return "".join("0" if day in weekend_days else "1" for day in range(7))
+
+
+class WorkingCalendar:
+    """
+    Working days of one institute: weekdays from the weekmask minus holidays.
+
+    Counting and enumeration use NumPy busday arithmetic, so a count is
+    constant time in the length of the range (holidays are binary searched).
+    """
+
+    def __init__(self, weekmask: str = DEFAULT_WEEKMASK, holidays: Iterable[date] = ()):
+        self.weekmask = weekmask
+        self.holidays = sorted(holidays)
+        self._busdaycal = np.busdaycalendar(
+            weekmask=weekmask,
+            holidays=np.array(self.holidays, dtype="datetime64[D]")
+        )
+
+    def count(self, start_date: date, end_date: date) -> int:
+        """Number of working days between start_date and end_date, inclusive"""
+        if end_date < start_date:
+            return 0
+        return int(np.busday_count(
+            np.datetime64(start_date, "D"),
+            np.datetime64(end_date, "D") + ONE_DAY,
+            busdaycal=self._busdaycal
+        ))
+
+    def working_days(self, start_date: date, end_date: date) -> List[date]:
+        """Working days between start_date and end_date, inclusive, oldest first"""
+        if end_date < start_date:
+            return []
+        days = np.arange(
+            np.datetime64(start_date, "D"),
+            np.datetime64(end_date, "D") + ONE_DAY,
+            dtype="datetime64[D]"
+        )
+        return days[np.is_busday(days, busdaycal=self._busdaycal)].tolist()
+
+    def is_working_day(self, check_date: date) -> bool:
+        return bool(np.is_busday(np.datetime64(check_date, "D"), busdaycal=self._busdaycal))
+
+    def is_weekend(self, check_date: date) -> bool:
+        return self.weekmask[check_date.weekday()] == "0"
+
+    def is_holiday(self, check_date: date) -> bool:
+        return not self.is_weekend(check_date) and not self.is_working_day(check_date)
+
+
+def local_date(timestamp: datetime) -> date:
+    """
+    Attendance date of a timestamp in INSTITUTE_TIMEZONE. Timestamps
+    without an offset are taken as institute-local already.
+    """
+    if timestamp.tzinfo is None:
+        return timestamp.date()
+    return timestamp.astimezone(INSTITUTE_TIMEZONE).date()
+
+
+def local_today() -> date:
+    """Today's date in INSTITUTE_TIMEZONE"""
+    return datetime.now(INSTITUTE_TIMEZONE).date()
+
+
+# Calendar used when no institute is known: Monday to Friday, no holidays
+DEFAULT_CALENDAR = WorkingCalendar()
+
+_calendar_cache: Dict[str, Tuple[WorkingCalendar, float]] = {}
+_calendar_cache_lock = threading.Lock()
+
+
+def get_working_calendar(institute_id: Optional[str], db: Session) -> WorkingCalendar:
+    """
+    Working calendar of an institute, cached in-process for
+    CALENDAR_CACHE_TTL_SECONDS (writes through this process invalidate it
+    immediately, other workers catch up within the TTL)
+    """
+    if not institute_id:
+        return DEFAULT_CALENDAR
+
+    with _calendar_cache_lock:
+        cached = _calendar_cache.get(institute_id)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+    settings = db.query(InstituteCalendar.weekmask).filter(
+        InstituteCalendar.institute_id == institute_id
+    ).first()
+
+    holidays = [
+        holiday_date for (holiday_date,) in db.query(InstituteHoliday.holiday_date).filter(
+            InstituteHoliday.institute_id == institute_id
+        )
+    ]
+
+    if not settings and not holidays:
+        working_calendar = DEFAULT_CALENDAR
+    else:
+        working_calendar = WorkingCalendar(
+            settings.weekmask if settings else DEFAULT_WEEKMASK,
+            holidays
+        )
+
+    with _calendar_cache_lock:
+        _calendar_cache[institute_id] = (working_calendar, time.time() + CALENDAR_CACHE_TTL_SECONDS)
+
+    return working_calendar
+
+
+def invalidate_working_calendar(institute_id: str) -> None:
+    """Drop the cached calendar of an institute (holidays or weekends changed)"""
+    with _calendar_cache_lock:
+        _calendar_cache.pop(institute_id, None)
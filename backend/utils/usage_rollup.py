@@ -0,0 +1,195 @@
+# utils/usage_rollup.py
+import os
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Optional
+from datetime import date, timedelta
+
+# Import your models
+from models.attendance import Attendance
+from models.institute_daily_usage import InstituteDailyUsage
+from models.user_daily_activity import UserDailyActivity
+
+# Days of per-user login rows kept after compaction (older days are fully rolled up)
+USAGE_ACTIVITY_RETENTION_DAYS = int(os.getenv("USAGE_ACTIVITY_RETENTION_DAYS", "7"))
+
+USAGE_COUNTERS = ("attendance_events", "active_users", "logins", "report_generations")
+
+
+def _dialect_insert(db: Session):
+    """INSERT with ON CONFLICT support for the session's database, or None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def record_usage(db: Session, institute_id: Optional[str], usage_date: date, **counts: int) -> None:
+    """
+    Add counts (attendance_events, active_users, logins, report_generations)
+    to the usage row of (institute, date) with one upsert.
+
+    Must be called in the same transaction as the write it counts; the
+    caller commits.
+    """
+    counts = {name: value for name, value in counts.items() if value}
+    if not institute_id or not counts:
+        return
+
+    unknown = set(counts) - set(USAGE_COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown usage counters: {', '.join(sorted(unknown))}")
+
+    insert = _dialect_insert(db)
+    if insert is not None:
+        statement = insert(InstituteDailyUsage).values(
+            institute_id=institute_id,
+            usage_date=usage_date,
+            **{name: counts.get(name, 0) for name in USAGE_COUNTERS}
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[InstituteDailyUsage.institute_id, InstituteDailyUsage.usage_date],
+            set_={
+                name: getattr(InstituteDailyUsage, name) + getattr(statement.excluded, name)
+                for name in counts
+            }
+        )
+        db.execute(statement)
+        return
+
+    # Portable fallback: locked read, then update or insert
+    usage = db.query(InstituteDailyUsage).filter(
+        InstituteDailyUsage.institute_id == institute_id,
+        InstituteDailyUsage.usage_date == usage_date
+    ).with_for_update().first()
+
+    if usage:
+        for name, value in counts.items():
+            setattr(usage, name, getattr(usage, name) + value)
+    else:
+        db.add(InstituteDailyUsage(
+            institute_id=institute_id,
+            usage_date=usage_date,
+            **{name: counts.get(name, 0) for name in USAGE_COUNTERS}
+        ))
+    db.flush()
+
+
+def record_login(db: Session, user_id: int, institute_id: Optional[str], login_date: date) -> None:
+    """Count a login, and an active user on the user's first login of the day"""
+    if not institute_id:
+        return
+
+    first_today = False
+    insert = _dialect_insert(db)
+    if insert is not None:
+        first_today = db.execute(
+            insert(UserDailyActivity).values(
+                user_id=user_id,
+                activity_date=login_date,
+                institute_id=institute_id
+            ).on_conflict_do_nothing().returning(UserDailyActivity.user_id)
+        ).first() is not None
+    elif not db.get(UserDailyActivity, (user_id, login_date)):
+        db.add(UserDailyActivity(user_id=user_id, activity_date=login_date, institute_id=institute_id))
+        first_today = True
+
+    record_usage(db, institute_id, login_date, logins=1, active_users=1 if first_today else 0)
+
+
+def compact_usage(db: Session, start_date: date, end_date: date) -> int:
+    """
+    Nightly compaction / backfill of [start_date, end_date].
+
+    attendance_events and active_users are recomputed from attendance and
+    user_daily_activity (absorbing deletes and any missed increments);
+    logins and report_generations only exist as counters and are kept.
+    Login rows older than USAGE_ACTIVITY_RETENTION_DAYS are then deleted.
+
+    Returns:
+        Number of usage rows written
+    """
+    exact: Dict[tuple, Dict[str, int]] = {}
+
+    attendance_counts = db.query(
+        Attendance.institute_id,
+        Attendance.attendance_date,
+        func.count(Attendance.id)
+    ).filter(
+        Attendance.attendance_date >= start_date,
+        Attendance.attendance_date <= end_date
+    ).group_by(
+        Attendance.institute_id,
+        Attendance.attendance_date
+    )
+    for institute_id, usage_date, count in attendance_counts:
+        exact.setdefault((institute_id, usage_date), {})["attendance_events"] = count
+
+    active_counts = db.query(
+        UserDailyActivity.institute_id,
+        UserDailyActivity.activity_date,
+        func.count(UserDailyActivity.user_id)
+    ).filter(
+        UserDailyActivity.activity_date >= start_date,
+        UserDailyActivity.activity_date <= end_date
+    ).group_by(
+        UserDailyActivity.institute_id,
+        UserDailyActivity.activity_date
+    )
+    for institute_id, usage_date, count in active_counts:
+        exact.setdefault((institute_id, usage_date), {})["active_users"] = count
+
+    existing = {
+        (usage.institute_id, usage.usage_date): usage
+        for usage in db.query(InstituteDailyUsage).filter(
+            InstituteDailyUsage.usage_date >= start_date,
+            InstituteDailyUsage.usage_date <= end_date
+        )
+    }
+
+    written = 0
+    for key in set(existing) | set(exact):
+        counts = exact.get(key, {})
+        usage = existing.get(key)
+        if usage is None:
+            usage = InstituteDailyUsage(institute_id=key[0], usage_date=key[1], logins=0, report_generations=0)
+            db.add(usage)
+        usage.attendance_events = counts.get("attendance_events", 0)
+        # Login rows already pruned: keep the counted value
+        if "active_users" in counts or key[1] >= date.today() - timedelta(days=USAGE_ACTIVITY_RETENTION_DAYS):
+            usage.active_users = counts.get("active_users", 0)
+        written += 1
+
+    db.query(UserDailyActivity).filter(
+        UserDailyActivity.activity_date < date.today() - timedelta(days=USAGE_ACTIVITY_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+
+    db.commit()
+    return written
+
+
+if __name__ == "__main__":
+    # Nightly: python -m utils.usage_rollup               (yesterday and today)
+    # Backfill: python -m utils.usage_rollup START [END]  (YYYY-MM-DD)
+    import sys
+    from database import SessionLocal, engine, Base
+
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[InstituteDailyUsage.__table__, UserDailyActivity.__table__]
+    )
+
+    today = date.today()
+    start = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else today - timedelta(days=1)
+    end = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else today
+
+    db = SessionLocal()
+    try:
+        written = compact_usage(db, start, end)
+        print(f"Compacted institute_daily_usage {start} to {end}: {written} rows")
+    finally:
+        db.close()